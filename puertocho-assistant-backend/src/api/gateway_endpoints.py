@@ -6,21 +6,133 @@ Endpoints que actúan como gateway entre frontend, hardware y backend remoto.
 Reemplaza el api_v1.py anterior con nueva funcionalidad gateway.
 """
 
+import asyncio
+import hashlib
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException, Body
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional, List
+import secrets
+import struct
+from functools import lru_cache
+from fastapi import APIRouter, UploadFile, File, HTTPException, Body, Request
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, root_validator
+import orjson
+from starlette.concurrency import run_in_threadpool
+from multipart.multipart import parse_options_header
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, Literal, Set
 from datetime import datetime
 
-from core.state_manager import get_state_manager, BackendState
-from services.audio_processor import get_audio_processor
+from core.state_manager import get_state_manager, BackendState, StateManagerGateway
+from services.audio_processor import get_audio_processor, AudioProcessor
 from clients.hardware_client import get_hardware_client
+from clients.remote_backend_client import get_remote_client
+from utils.cache import AsyncTTLCache
+from utils.clock import now_iso
+
+
+class HardwareEvent(BaseModel):
+    """Evento enviado por el hardware (botón, audio capturado, etc.)"""
+    type: str = "unknown"
+    timestamp: Optional[Any] = None  # ISO string o epoch según el emisor
+    
+    class Config:
+        extra = "allow"
+
+
+class LedPatternParams(BaseModel):
+    """Parámetros de 'led_pattern' (argumentos de set_led_pattern)"""
+    pattern_type: str
+    color: Optional[str] = None
+    duration: Optional[float] = 1.0
+    brightness: Optional[int] = None
+    
+    class Config:
+        extra = "forbid"
+
+
+class ButtonSimulateParams(BaseModel):
+    """Parámetros de 'button_simulate' (argumentos de simulate_button_press)"""
+    event_type: str
+    duration: Optional[float] = None
+    
+    class Config:
+        extra = "forbid"
+
+
+COMMAND_PARAMS_MODELS = {
+    "led_pattern": LedPatternParams,
+    "button_simulate": ButtonSimulateParams
+}
+
+
+class HardwareCommand(BaseModel):
+    """Comando del frontend hacia el hardware"""
+    type: Literal["led_pattern", "state_change", "button_simulate"]
+    params: Dict[str, Any] = {}
+    state: Optional[str] = None  # Solo para 'state_change'
+    
+    class Config:
+        extra = "allow"
+    
+    @root_validator(skip_on_failure=True)
+    def _check_command_payload(cls, values):
+        """Validar params/state según el tipo de comando (422 si no encajan)"""
+        command_type = values["type"]
+        if command_type == "state_change":
+            if not values.get("state"):
+                raise ValueError("'state' is required for state_change")
+        else:
+            params = COMMAND_PARAMS_MODELS[command_type](**values.get("params") or {})
+            values["params"] = params.dict(exclude_unset=True)
+        return values
 
 
 # Router para endpoints de gateway
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = logging.getLogger("gateway_api")
 
+# Lectura de uploads por bloques para no materializar el audio completo en RAM
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Bytes necesarios para analizar el header WAV canónico
+AUDIO_HEADER_SIZE = 44
+# Campos del chunk fmt a partir del offset 22 (little endian):
+# channels, sample_rate, byte_rate, block_align, bits_per_sample
+WAV_FMT_STRUCT = struct.Struct('<HIIHH')
+WAV_FMT_OFFSET = 22
+# Tamaño del chunk RIFF (offset 4): tamaño declarado del archivo menos 8 bytes
+WAV_RIFF_SIZE_STRUCT = struct.Struct('<I')
+WAV_RIFF_SIZE_OFFSET = 4
+# Valores de relleno de WAVs en streaming o sin finalizar: tamaño desconocido
+WAV_RIFF_SIZE_UNKNOWN = frozenset({0, 0xFFFFFFFF})
+# Entradas memorizadas del análisis de audio (reenvíos del hardware)
+AUDIO_ANALYSIS_CACHE_SIZE = 256
+
+# TTL (segundos) de la caché de endpoints consultados por polling. /state no
+# pasa por aquí: get_unified_state ya está memoizado sobre sus entradas
+METRICS_CACHE_TTL = 2.0
+VERIFICATION_CACHE_TTL = 2.0
+
+# Singletons del proceso, enlazados una vez en el arranque (ver bind_services)
+_STATE_MGR: Optional[StateManagerGateway] = None
+_AUDIO_PROC: Optional[AudioProcessor] = None
+
+# Tareas de procesamiento de audio en curso (referencia fuerte hasta que terminen)
+_AUDIO_JOBS: Set[asyncio.Task] = set()
+
+# Varios clientes haciendo polling comparten un único cálculo/fetch por ventana
+_POLL_CACHE = AsyncTTLCache(ttl=METRICS_CACHE_TTL)
+
+
+def bind_services():
+    """
+    Enlazar los singletons del backend a nivel de módulo.
+    
+    Debe llamarse desde el lifespan una vez inicializados el StateManager
+    y el AudioProcessor; evita resolverlos con get_*() en cada petición.
+    """
+    global _STATE_MGR, _AUDIO_PROC
+    _STATE_MGR = get_state_manager()
+    _AUDIO_PROC = get_audio_processor()
+
 
 # ===============================================
 # ENDPOINTS PARA RECIBIR DATOS DEL HARDWARE
@@ -34,100 +146,132 @@ async def receive_audio_from_hardware(audio: UploadFile = File(...)):
     El hardware puede enviar audio aquí directamente o podemos
     obtenerlo de su API. Este endpoint es para compatibilidad futura.
     """
+    return await _receive_audio_impl(
+        _iter_upload_chunks(audio), audio.filename, audio.content_type, "/hardware/audio"
+    )
+
+
+@router.post("/hardware/audio/raw")
+async def receive_raw_audio_from_hardware(request: Request):
+    """
+    Recibe audio del hardware como cuerpo crudo (Content-Type: audio/*).
+    
+    Evita el parser multipart y el SpooledTemporaryFile de UploadFile:
+    el cuerpo se consume directamente del stream ASGI. El nombre del
+    archivo se toma de Content-Disposition si está presente.
+    """
+    filename = "unknown"
+    content_disposition = request.headers.get("content-disposition")
+    if content_disposition:
+        _, options = parse_options_header(content_disposition)
+        if b"filename" in options:
+            filename = options[b"filename"].decode("latin-1")
+    
+    return await _receive_audio_impl(
+        request.stream(), filename, request.headers.get("content-type"), "/hardware/audio/raw"
+    )
+
+
+async def _receive_audio_impl(
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    content_type: Optional[str],
+    endpoint: str
+) -> Response:
+    """
+    Flujo común de recepción de audio (multipart o cuerpo crudo).
+    
+    Valida y analiza el audio y responde 202 en cuanto lo ha recibido;
+    el procesamiento continúa en _process_audio_job.
+    
+    Args:
+        chunks: Iterador asíncrono con el contenido del audio
+        filename: Nombre del archivo
+        content_type: Content-Type declarado por el cliente
+        endpoint: Ruta por la que llegó el audio (se registra en audio_info)
+    """
     reception_timestamp = datetime.now()
-    processing_start = None
+    reception_iso = reception_timestamp.isoformat()
+    # Un solo chequeo de nivel por petición; los registros usan formato % diferido
+    log_info = logger.isEnabledFor(logging.INFO)
     
     try:
-        # Logging detallado de recepción
-        logger.info(f"📥 Audio reception started from hardware")
-        logger.info(f"📄 Filename: {audio.filename}")
-        logger.info(f"📅 Reception timestamp: {reception_timestamp.isoformat()}")
+        if log_info:
+            logger.info("📥 Audio reception started from hardware: %s via %s at %s",
+                        filename, endpoint, reception_iso)
         
-        # Leer contenido del archivo
-        audio_content = await audio.read()
+        # Leer el archivo por bloques (solo se conserva header, tamaño y digest)
+        header, size_bytes, content_digest = await _read_audio_chunks(chunks)
         
         # Validar que realmente sea un archivo de audio
-        if not audio.content_type or not audio.content_type.startswith('audio/'):
-            logger.warning(f"⚠️ Unexpected content type: {audio.content_type}")
+        if not content_type or not content_type.startswith('audio/'):
+            logger.warning("⚠️ Unexpected content type: %s", content_type)
         
-        # Logging de metadatos del archivo
-        logger.info(f"📊 Audio file size: {len(audio_content)} bytes ({len(audio_content)/1024:.2f} KB)")
-        logger.info(f"🏷️ Content type: {audio.content_type}")
+        if log_info:
+            logger.info("📊 Audio file size: %d bytes (%.2f KB), content type: %s",
+                        size_bytes, size_bytes / 1024, content_type)
         
         # Validar tamaño del archivo
-        if len(audio_content) == 0:
+        if size_bytes == 0:
             logger.error("❌ Received empty audio file")
             raise HTTPException(status_code=400, detail="Empty audio file received")
         
-        # Estimar metadatos básicos del audio (asumiendo WAV estándar)
-        audio_metrics = _analyze_audio_basic_metrics(audio_content, audio.filename)
-        logger.info(f"🎵 Estimated audio metrics: {audio_metrics}")
+        # Estimar metadatos básicos del audio (asumiendo WAV estándar).
+        # Trabajo CPU puro: se ejecuta en el threadpool para no bloquear el event loop
+        audio_metrics = await run_in_threadpool(
+            _analyze_audio_basic_metrics, header, size_bytes, filename
+        )
+        if log_info:
+            logger.info("🎵 Estimated audio metrics: format=%s duration=%s score=%s",
+                        audio_metrics.get("estimated_format"),
+                        audio_metrics.get("estimated_duration_seconds"),
+                        audio_metrics["quality_indicators"].get("quality_score"))
         
         # Crear información del audio con metadatos extendidos
         audio_info = {
-            "filename": audio.filename,
-            "size_bytes": len(audio_content),
-            "content_type": audio.content_type,
-            "received_at": reception_timestamp.isoformat(),
-            "reception_endpoint": "/hardware/audio",
+            "filename": filename,
+            "size_bytes": size_bytes,
+            "content_digest": content_digest,
+            "content_type": content_type,
+            "received_at": reception_iso,
+            "reception_endpoint": endpoint,
             "audio_metrics": audio_metrics
         }
         
-        # Marcar inicio de procesamiento
-        processing_start = datetime.now()
-        logger.info(f"⚡ Starting audio processing at: {processing_start.isoformat()}")
-        
-        # Procesar con AudioProcessor
-        audio_processor = get_audio_processor()
-        result = await audio_processor.process_audio_from_hardware(audio_info)
-        
-        # Calcular tiempo de procesamiento
-        processing_end = datetime.now()
-        processing_duration = (processing_end - processing_start).total_seconds()
-        logger.info(f"⏱️ Audio processing completed in {processing_duration:.3f} seconds")
-        
-        # Logging del resultado del procesamiento
-        if result.get("success"):
-            logger.info(f"✅ Audio processing successful - ID: {result.get('audio_id')}")
-            logger.info(f"📍 Queue position: {result.get('queue_position')}")
-        else:
-            logger.error(f"❌ Audio processing failed: {result.get('error')}")
+        # El procesamiento (fetch + descarga desde el hardware, cola) corre en
+        # segundo plano; el resultado llega al frontend por WebSocket
+        job_id = secrets.token_hex(4)
+        task = asyncio.create_task(_process_audio_job(job_id, audio_info))
+        _AUDIO_JOBS.add(task)
+        task.add_done_callback(_AUDIO_JOBS.discard)
         
-        # Actualizar estado del backend
-        state_manager = get_state_manager()
-        await state_manager.set_backend_state(BackendState.PROCESSING_AUDIO)
-        
-        # Respuesta con información extendida
         response_data = {
-            "status": "success",
-            "message": "Audio received and queued for processing",
+            "status": "accepted",
+            "message": "Audio received, processing in background",
+            "job_id": job_id,
             "audio_info": audio_info,
-            "processing_result": result,
             "timing": {
-                "received_at": reception_timestamp.isoformat(),
-                "processing_started_at": processing_start.isoformat(),
-                "processing_completed_at": processing_end.isoformat(),
-                "total_processing_time_seconds": processing_duration
+                "received_at": reception_iso,
+                "accepted_at": now_iso()
             }
         }
         
-        logger.info(f"📤 Sending successful response for audio: {audio.filename}")
-        
-        return JSONResponse(
-            content=response_data,
-            status_code=200
+        # Respuesta más pesada del router: serializar directamente con orjson
+        # evita la pasada de jsonable_encoder de FastAPI
+        return Response(
+            content=orjson.dumps(response_data),
+            media_type="application/json",
+            status_code=202
         )
         
     except HTTPException:
         # Re-raise HTTP exceptions without logging as errors
         raise
     except Exception as e:
-        processing_end = datetime.now() if processing_start else reception_timestamp
-        total_time = (processing_end - reception_timestamp).total_seconds()
+        total_time = (datetime.now() - reception_timestamp).total_seconds()
         
-        logger.error(f"❌ Failed to receive audio from hardware: {e}")
-        logger.error(f"💥 Error occurred after {total_time:.3f} seconds")
-        logger.error(f"📄 Failed file: {audio.filename if audio else 'unknown'}")
+        logger.error("❌ Failed to receive audio from hardware (%s) after %.3f seconds: %s",
+                     filename, total_time, e)
         
         raise HTTPException(
             status_code=500,
@@ -135,163 +279,97 @@ async def receive_audio_from_hardware(audio: UploadFile = File(...)):
         )
 
 
-def _analyze_audio_basic_metrics(audio_content: bytes, filename: str) -> Dict[str, Any]:
+async def _process_audio_job(job_id: str, audio_info: Dict[str, Any]):
+    """
+    Procesar en segundo plano un audio ya recibido.
+    
+    AudioProcessor notifica por WebSocket tanto el audio encolado como
+    los errores, así que aquí solo se registra el resultado y se
+    actualiza el estado del backend.
+    """
+    processing_start = datetime.now()
+    try:
+        result = await _AUDIO_PROC.process_audio_from_hardware(audio_info)
+        processing_duration = (datetime.now() - processing_start).total_seconds()
+        
+        if result.get("success"):
+            logger.info("✅ Audio job %s processed in %.3f seconds - ID: %s, queue position: %s",
+                        job_id, processing_duration, result.get("audio_id"), result.get("queue_position"))
+        else:
+            logger.error("❌ Audio job %s failed after %.3f seconds: %s",
+                         job_id, processing_duration, result.get("error"))
+        
+        await _STATE_MGR.set_backend_state(BackendState.PROCESSING_AUDIO)
+        
+    except Exception as e:
+        logger.error("❌ Audio job %s crashed: %s", job_id, e)
+
+
+async def _iter_upload_chunks(audio: UploadFile) -> AsyncIterator[bytes]:
+    """Iterar un UploadFile en bloques de UPLOAD_CHUNK_SIZE."""
+    while chunk := await audio.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+async def _read_audio_chunks(chunks: AsyncIterator[bytes]) -> Tuple[bytes, int, str]:
+    """
+    Consumir el audio por bloques sin materializarlo completo.
+    
+    Returns:
+        Tupla (header, tamaño total en bytes, digest blake2b del contenido).
+        El pico de memoria queda acotado al tamaño de bloque.
+    """
+    header = bytearray()
+    size_bytes = 0
+    hasher = hashlib.blake2b(digest_size=16)
+    
+    async for chunk in chunks:
+        if len(header) < AUDIO_HEADER_SIZE:
+            header += chunk[:AUDIO_HEADER_SIZE - len(header)]
+        hasher.update(chunk)
+        size_bytes += len(chunk)
+    
+    return bytes(header), size_bytes, hasher.hexdigest()
+
+
+@lru_cache(maxsize=AUDIO_ANALYSIS_CACHE_SIZE)
+def _analyze_audio_basic_metrics(header: bytes, size_bytes: int, filename: str) -> Dict[str, Any]:
     """
     Analiza métricas básicas del audio sin librerías externas.
     
     Para WAV files, podemos extraer información básica del header.
     Incluye validaciones de calidad básicas.
+    
+    Función pura de (header, tamaño, nombre): se memoriza para que los
+    reenvíos del mismo archivo no repitan el análisis. El dict devuelto
+    es compartido entre llamadas y debe tratarse como solo lectura.
+    
+    Args:
+        header: Primeros AUDIO_HEADER_SIZE bytes del archivo
+        size_bytes: Tamaño total del archivo
+        filename: Nombre del archivo
     """
     metrics = {
         "file_extension": filename.split('.')[-1].lower() if '.' in filename else "unknown",
-        "size_bytes": len(audio_content),
-        "size_kb": len(audio_content) / 1024,
+        "size_bytes": size_bytes,
+        "size_kb": size_bytes / 1024,
         "estimated_format": "unknown",
         "quality_indicators": {}
     }
     
     try:
-        # Para archivos WAV, intentar leer el header básico
-        if audio_content.startswith(b'RIFF') and len(audio_content) > 12 and audio_content[8:12] == b'WAVE':
-            metrics["estimated_format"] = "wav"
-            
-            # Validar estructura básica WAV
-            quality_issues = []
-            
-            # Verificar tamaño mínimo del header WAV
-            if len(audio_content) < 44:
-                quality_issues.append("WAV file too small (incomplete header)")
-                metrics["quality_indicators"]["issues"] = quality_issues
-                return metrics
-            
-            try:
-                # Extraer información del header WAV
-                # Sample rate está en bytes 24-27 (little endian)
-                sample_rate = int.from_bytes(audio_content[24:28], byteorder='little')
-                # Channels está en bytes 22-23 (little endian)
-                channels = int.from_bytes(audio_content[22:24], byteorder='little')
-                # Bits per sample está en bytes 34-35 (little endian)
-                bits_per_sample = int.from_bytes(audio_content[34:36], byteorder='little')
-                # Byte rate está en bytes 28-31 (little endian)
-                byte_rate = int.from_bytes(audio_content[28:32], byteorder='little')
-                # Block align está en bytes 32-33 (little endian)
-                block_align = int.from_bytes(audio_content[32:34], byteorder='little')
-                
-                # Calcular duración estimada
-                data_size = len(audio_content) - 44  # Restar header
-                duration_seconds = data_size / byte_rate if byte_rate > 0 else None
-                
-                metrics.update({
-                    "sample_rate_hz": sample_rate,
-                    "channels": channels,
-                    "bits_per_sample": bits_per_sample,
-                    "byte_rate": byte_rate,
-                    "block_align": block_align,
-                    "data_size_bytes": data_size,
-                    "estimated_duration_seconds": duration_seconds
-                })
-                
-                # Validaciones de calidad
-                quality_score = 100  # Empezar con puntuación perfecta
-                
-                # Verificar sample rate válido
-                if sample_rate < 8000:
-                    quality_issues.append("Very low sample rate (< 8kHz)")
-                    quality_score -= 20
-                elif sample_rate < 16000:
-                    quality_issues.append("Low sample rate (< 16kHz)")
-                    quality_score -= 10
-                elif sample_rate > 48000:
-                    quality_issues.append("Unusually high sample rate (> 48kHz)")
-                    quality_score -= 5
-                
-                # Verificar channels válidos
-                if channels < 1 or channels > 2:
-                    quality_issues.append(f"Unusual channel count: {channels}")
-                    quality_score -= 15
-                
-                # Verificar bits per sample
-                if bits_per_sample < 16:
-                    quality_issues.append("Low bit depth (< 16 bits)")
-                    quality_score -= 15
-                elif bits_per_sample > 32:
-                    quality_issues.append("Unusually high bit depth (> 32 bits)")
-                    quality_score -= 5
-                
-                # Verificar duración
-                if duration_seconds is not None:
-                    if duration_seconds < 0.1:
-                        quality_issues.append("Very short duration (< 0.1s)")
-                        quality_score -= 25
-                    elif duration_seconds < 1.0:
-                        quality_issues.append("Short duration (< 1s)")
-                        quality_score -= 10
-                    elif duration_seconds > 60:
-                        quality_issues.append("Very long duration (> 60s)")
-                        quality_score -= 5
-                
-                # Verificar coherencia de datos
-                expected_byte_rate = sample_rate * channels * (bits_per_sample // 8)
-                if abs(byte_rate - expected_byte_rate) > expected_byte_rate * 0.01:  # 1% tolerance
-                    quality_issues.append("Byte rate doesn't match other parameters")
-                    quality_score -= 10
-                
-                expected_block_align = channels * (bits_per_sample // 8)
-                if block_align != expected_block_align:
-                    quality_issues.append("Block align doesn't match other parameters")
-                    quality_score -= 10
-                
-                # Análisis de tamaño de archivo
-                expected_size = duration_seconds * byte_rate if duration_seconds else 0
-                size_difference = abs(data_size - expected_size) / expected_size if expected_size > 0 else 0
-                if size_difference > 0.05:  # 5% tolerance
-                    quality_issues.append(f"File size doesn't match expected size (diff: {size_difference*100:.1f}%)")
-                    quality_score -= 15
-                
-                metrics["quality_indicators"] = {
-                    "quality_score": max(0, quality_score),
-                    "issues": quality_issues,
-                    "is_high_quality": quality_score >= 80,
-                    "is_acceptable": quality_score >= 60,
-                    "recommendations": _generate_audio_recommendations(metrics, quality_issues)
-                }
-                
-            except Exception as header_error:
-                quality_issues.append(f"Error parsing WAV header: {str(header_error)}")
-                metrics["quality_indicators"] = {
-                    "quality_score": 0,
-                    "issues": quality_issues,
-                    "is_high_quality": False,
-                    "is_acceptable": False
-                }
-        
-        elif audio_content.startswith(b'ID3') or audio_content.startswith(b'\xff\xfb'):
-            metrics["estimated_format"] = "mp3"
-            # Para MP3, análisis básico limitado
-            quality_issues = ["MP3 format - limited analysis available"]
-            metrics["quality_indicators"] = {
-                "quality_score": 50,  # Puntuación neutral para MP3
-                "issues": quality_issues,
-                "is_high_quality": False,
-                "is_acceptable": True
-            }
-        
-        else:
-            quality_issues = ["Unrecognized audio format"]
-            metrics["quality_indicators"] = {
-                "quality_score": 0,
-                "issues": quality_issues,
-                "is_high_quality": False,
-                "is_acceptable": False
-            }
+        # Detección de formato por número mágico: una búsqueda por longitud de prefijo
+        handler = _detect_format_handler(header)
+        if not handler(header, size_bytes, metrics):
+            return metrics
         
         # Validaciones generales independientes del formato
         general_issues = []
-        if len(audio_content) == 0:
+        if size_bytes == 0:
             general_issues.append("Empty file")
-        elif len(audio_content) < 1024:  # 1KB
+        elif size_bytes < 1024:  # 1KB
             general_issues.append("Very small file size")
-        elif len(audio_content) > 50 * 1024 * 1024:  # 50MB
+        elif size_bytes > 50 * 1024 * 1024:  # 50MB
             general_issues.append("Very large file size")
         
         if general_issues:
@@ -311,19 +389,194 @@ def _analyze_audio_basic_metrics(audio_content: bytes, filename: str) -> Dict[st
     return metrics
 
 
+def _detect_format_handler(header: bytes):
+    """Resolver el analizador del formato a partir de los primeros bytes."""
+    for prefix_len, table in AUDIO_FORMAT_MAGIC:
+        handler = table.get(header[:prefix_len])
+        if handler is not None:
+            return handler
+    return _analyze_unknown_header
+
+
+# Reglas de calidad WAV: (campo, ((predicado, penalización, mensaje), ...)).
+# Dentro de cada campo gana la primera regla que se cumple (equivale al if/elif)
+WAV_QUALITY_RULES = (
+    ("sample_rate_hz", (
+        (lambda v: v < 8000, 20, "Very low sample rate (< 8kHz)"),
+        (lambda v: v < 16000, 10, "Low sample rate (< 16kHz)"),
+        (lambda v: v > 48000, 5, "Unusually high sample rate (> 48kHz)"),
+    )),
+    ("channels", (
+        (lambda v: v < 1 or v > 2, 15, "Unusual channel count: {}"),
+    )),
+    ("bits_per_sample", (
+        (lambda v: v < 16, 15, "Low bit depth (< 16 bits)"),
+        (lambda v: v > 32, 5, "Unusually high bit depth (> 32 bits)"),
+    )),
+    ("estimated_duration_seconds", (
+        (lambda v: v < 0.1, 25, "Very short duration (< 0.1s)"),
+        (lambda v: v < 1.0, 10, "Short duration (< 1s)"),
+        (lambda v: v > 60, 5, "Very long duration (> 60s)"),
+    )),
+)
+
+
+def _apply_quality_rules(metrics: Dict[str, Any]) -> Tuple[int, List[str]]:
+    """
+    Evaluar WAV_QUALITY_RULES sobre las métricas extraídas.
+    
+    Returns:
+        Tupla (penalización total, lista de problemas detectados)
+    """
+    penalty = 0
+    issues = []
+    for field, rules in WAV_QUALITY_RULES:
+        value = metrics.get(field)
+        if value is None:
+            continue
+        for predicate, rule_penalty, message in rules:
+            if predicate(value):
+                penalty += rule_penalty
+                issues.append(message.format(value))
+                break
+    return penalty, issues
+
+
+def _analyze_wav_header(header: bytes, size_bytes: int, metrics: Dict[str, Any]) -> bool:
+    """
+    Analizar el header de un WAV y rellenar metrics.
+    
+    Returns:
+        False si el header está incompleto y el análisis termina aquí
+    """
+    if header[8:12] != b'WAVE':
+        # RIFF que no es WAVE (AVI, WEBP...): no es un formato de audio soportado
+        return _analyze_unknown_header(header, size_bytes, metrics)
+    
+    metrics["estimated_format"] = "wav"
+    
+    # Validar estructura básica WAV
+    quality_issues = []
+    
+    # Verificar tamaño mínimo del header WAV
+    if len(header) < AUDIO_HEADER_SIZE:
+        quality_issues.append("WAV file too small (incomplete header)")
+        metrics["quality_indicators"]["issues"] = quality_issues
+        return False
+    
+    # Extraer información del header WAV en una sola pasada
+    (channels, sample_rate, byte_rate,
+     block_align, bits_per_sample) = WAV_FMT_STRUCT.unpack_from(header, WAV_FMT_OFFSET)
+    
+    # Calcular duración estimada
+    data_size = size_bytes - AUDIO_HEADER_SIZE  # Restar header
+    duration_seconds = data_size / byte_rate if byte_rate > 0 else None
+    
+    metrics.update({
+        "sample_rate_hz": sample_rate,
+        "channels": channels,
+        "bits_per_sample": bits_per_sample,
+        "byte_rate": byte_rate,
+        "block_align": block_align,
+        "data_size_bytes": data_size,
+        "estimated_duration_seconds": duration_seconds
+    })
+    
+    # Validaciones de calidad: tabla de reglas por campo
+    penalty, quality_issues_found = _apply_quality_rules(metrics)
+    quality_issues.extend(quality_issues_found)
+    quality_score = 100 - penalty  # Empezar con puntuación perfecta
+    
+    # Verificar coherencia de datos
+    expected_byte_rate = sample_rate * channels * (bits_per_sample // 8)
+    if 100 * abs(byte_rate - expected_byte_rate) > expected_byte_rate:  # 1% tolerance
+        quality_issues.append("Byte rate doesn't match other parameters")
+        quality_score -= 10
+    
+    expected_block_align = channels * (bits_per_sample // 8)
+    if block_align != expected_block_align:
+        quality_issues.append("Block align doesn't match other parameters")
+        quality_score -= 10
+    
+    # Análisis de tamaño de archivo
+    # Comparar con el tamaño declarado en el chunk RIFF (aritmética entera),
+    # salvo que el WAV no lo declare (streaming o grabación sin finalizar)
+    riff_size = WAV_RIFF_SIZE_STRUCT.unpack_from(header, WAV_RIFF_SIZE_OFFSET)[0]
+    if riff_size not in WAV_RIFF_SIZE_UNKNOWN:
+        expected_size = riff_size + 8
+        size_difference = abs(size_bytes - expected_size)
+        if 20 * size_difference > expected_size:  # 5% tolerance
+            quality_issues.append(
+                f"File size doesn't match expected size (diff: {100 * size_difference // expected_size}%)"
+            )
+            quality_score -= 15
+    
+    metrics["quality_indicators"] = {
+        "quality_score": max(0, quality_score),
+        "issues": quality_issues,
+        "is_high_quality": quality_score >= 80,
+        "is_acceptable": quality_score >= 60,
+        "recommendations": _generate_audio_recommendations(metrics, quality_issues)
+    }
+    
+    return True
+
+
+def _analyze_mp3_header(header: bytes, size_bytes: int, metrics: Dict[str, Any]) -> bool:
+    """Análisis básico (limitado) de un MP3."""
+    metrics["estimated_format"] = "mp3"
+    quality_issues = ["MP3 format - limited analysis available"]
+    metrics["quality_indicators"] = {
+        "quality_score": 50,  # Puntuación neutral para MP3
+        "issues": quality_issues,
+        "is_high_quality": False,
+        "is_acceptable": True
+    }
+    return True
+
+
+def _analyze_unknown_header(header: bytes, size_bytes: int, metrics: Dict[str, Any]) -> bool:
+    """Formato no reconocido."""
+    quality_issues = ["Unrecognized audio format"]
+    metrics["quality_indicators"] = {
+        "quality_score": 0,
+        "issues": quality_issues,
+        "is_high_quality": False,
+        "is_acceptable": False
+    }
+    return True
+
+
+# Números mágicos por longitud de prefijo; se prueba primero el más largo.
+# MP3 sin tag ID3 empieza con el sync word de frame (0xFFFB), de solo 2 bytes
+AUDIO_FORMAT_MAGIC = (
+    (4, {b'RIFF': _analyze_wav_header}),
+    (3, {b'ID3': _analyze_mp3_header}),
+    (2, {b'\xff\xfb': _analyze_mp3_header}),
+)
+
+
+# Marcadores de problemas de coherencia del header (posible corrupción)
+_COHERENCE_MARKERS = ("coherence", "match")
+
+
 def _generate_audio_recommendations(metrics: Dict[str, Any], issues: List[str]) -> List[str]:
     """
     Generar recomendaciones basadas en los problemas encontrados en el audio.
+    
+    Sample rate, bit depth bajos y clips cortos siempre generan un issue,
+    así que esas comprobaciones solo se evalúan si hay issues.
     """
     recommendations = []
     
-    # Recomendaciones basadas en sample rate
-    if metrics.get("sample_rate_hz", 0) < 16000:
-        recommendations.append("Consider increasing sample rate to at least 16kHz for better speech quality")
-    
-    # Recomendaciones basadas en bits per sample
-    if metrics.get("bits_per_sample", 0) < 16:
-        recommendations.append("Use at least 16-bit depth for acceptable audio quality")
+    if issues:
+        # Recomendaciones basadas en sample rate
+        if metrics.get("sample_rate_hz", 0) < 16000:
+            recommendations.append("Consider increasing sample rate to at least 16kHz for better speech quality")
+        
+        # Recomendaciones basadas en bits per sample
+        if metrics.get("bits_per_sample", 0) < 16:
+            recommendations.append("Use at least 16-bit depth for acceptable audio quality")
     
     # Recomendaciones basadas en duración
     duration = metrics.get("estimated_duration_seconds", 0)
@@ -337,8 +590,10 @@ def _generate_audio_recommendations(metrics: Dict[str, Any], issues: List[str])
         recommendations.append("Large file size - consider compression or shorter duration")
     
     # Recomendaciones generales
-    if any("coherence" in issue.lower() or "match" in issue.lower() for issue in issues):
-        recommendations.append("Audio file may be corrupted - verify recording settings")
+    if issues:
+        issues_lc = [issue.lower() for issue in issues]
+        if any(marker in issue for issue in issues_lc for marker in _COHERENCE_MARKERS):
+            recommendations.append("Audio file may be corrupted - verify recording settings")
     
     return recommendations
 
@@ -351,24 +606,22 @@ async def receive_hardware_status(status: Dict[str, Any] = Body(...)):
     En la nueva arquitectura, obtenemos el estado directamente
     del hardware, pero este endpoint permite push notifications.
     """
+    received_iso = datetime.now().isoformat()
     try:
         logger.info(f"📡 Hardware status update received: {status}")
         
         # Procesar evento de hardware
-        state_manager = get_state_manager()
+        state_manager = _STATE_MGR
         await state_manager.handle_hardware_event({
             "type": "status_update",
             "status": status,
-            "received_at": datetime.now().isoformat()
+            "received_at": received_iso
         })
         
-        return JSONResponse(
-            content={
-                "status": "received",
-                "message": "Hardware status updated"
-            },
-            status_code=200
-        )
+        return {
+            "status": "received",
+            "message": "Hardware status updated"
+        }
         
     except Exception as e:
         logger.error(f"❌ Failed to process hardware status: {e}")
@@ -379,30 +632,29 @@ async def receive_hardware_status(status: Dict[str, Any] = Body(...)):
 
 
 @router.post("/hardware/events")
-async def receive_hardware_event(event: Dict[str, Any] = Body(...)):
+async def receive_hardware_event(event: HardwareEvent):
     """
     Recibe eventos del hardware (botón, audio capturado, etc.).
     """
     try:
-        event_type = event.get("type", "unknown")
+        event_type = event.type
         logger.info(f"📡 Hardware event received: {event_type}")
         
+        event_data = event.dict()
+        
         # Agregar timestamp si no existe
-        if "timestamp" not in event:
-            event["timestamp"] = datetime.now().isoformat()
+        if event.timestamp is None:
+            event_data["timestamp"] = datetime.now().isoformat()
         
         # Procesar evento
-        state_manager = get_state_manager()
-        await state_manager.handle_hardware_event(event)
-        
-        return JSONResponse(
-            content={
-                "status": "processed",
-                "event_type": event_type,
-                "message": "Hardware event processed"
-            },
-            status_code=200
-        )
+        state_manager = _STATE_MGR
+        await state_manager.handle_hardware_event(event_data)
+        
+        return {
+            "status": "processed",
+            "event_type": event_type,
+            "message": "Hardware event processed"
+        }
         
     except Exception as e:
         logger.error(f"❌ Failed to process hardware event: {e}")
@@ -421,19 +673,17 @@ async def get_unified_state():
     """
     Obtener estado unificado del sistema completo.
     
-    Combina estado del hardware, backend local y remoto.
+    Combina estado del hardware, backend local y remoto. Sin caché por
+    TTL: el estado unificado se reconstruye solo cuando cambian sus
+    entradas, así que el polling detecta los cambios en cuanto ocurren.
     """
     try:
-        state_manager = get_state_manager()
-        unified_state = state_manager.get_unified_state()
-        
-        return JSONResponse(
-            content={
-                "status": "success",
-                "state": unified_state
-            },
-            status_code=200
-        )
+        unified_state = _STATE_MGR.get_unified_state()
+        
+        return {
+            "status": "success",
+            "state": unified_state
+        }
         
     except Exception as e:
         logger.error(f"❌ Failed to get unified state: {e}")
@@ -444,7 +694,7 @@ async def get_unified_state():
 
 
 @router.post("/control/hardware")
-async def send_command_to_hardware(command: Dict[str, Any] = Body(...)):
+async def send_command_to_hardware(command: HardwareCommand):
     """
     Enviar comando al hardware desde el frontend.
     
@@ -454,31 +704,20 @@ async def send_command_to_hardware(command: Dict[str, Any] = Body(...)):
     - button_simulate: Simular pulsación de botón
     """
     try:
-        command_type = command.get("type")
-        if not command_type:
-            raise HTTPException(
-                status_code=400,
-                detail="Command type is required"
-            )
-        
+        command_type = command.type
         logger.info(f"🎮 Sending command to hardware: {command_type}")
         
         # Enviar comando al hardware
-        state_manager = get_state_manager()
-        result = await state_manager.send_command_to_hardware(command)
-        
-        return JSONResponse(
-            content={
-                "status": "success",
-                "command_type": command_type,
-                "result": result,
-                "message": "Command sent to hardware"
-            },
-            status_code=200
-        )
+        state_manager = _STATE_MGR
+        result = await state_manager.send_command_to_hardware(command.dict())
+        
+        return {
+            "status": "success",
+            "command_type": command_type,
+            "result": result,
+            "message": "Command sent to hardware"
+        }
         
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"❌ Failed to send command to hardware: {e}")
         raise HTTPException(
@@ -496,19 +735,16 @@ async def get_interaction_history():
     """
     try:
         # Por ahora retornamos información de la cola de audio
-        audio_processor = get_audio_processor()
-        queue_status = audio_processor.get_queue_status()
-        
-        return JSONResponse(
-            content={
-                "status": "success",
-                "history": {
-                    "audio_queue": queue_status,
-                    "note": "Full history implementation pending"
-                }
-            },
-            status_code=200
-        )
+        audio_processor = _AUDIO_PROC
+        queue_status = await run_in_threadpool(audio_processor.get_queue_status)
+        
+        return {
+            "status": "success",
+            "history": {
+                "audio_queue": queue_status,
+                "note": "Full history implementation pending"
+            }
+        }
         
     except Exception as e:
         logger.error(f"❌ Failed to get history: {e}")
@@ -526,43 +762,15 @@ async def get_system_metrics():
     Combina métricas del hardware, backend local y remoto.
     """
     try:
-        state_manager = get_state_manager()
-        audio_processor = get_audio_processor()
-        
-        # Obtener métricas del hardware
-        try:
-            hardware_metrics = await state_manager.get_hardware_metrics()
-        except Exception as e:
-            hardware_metrics = {"error": str(e), "available": False}
-        
-        # Métricas del backend local
-        backend_metrics = {
-            "backend_state": state_manager.backend_state.value,
-            "last_hardware_sync": state_manager.last_hardware_sync,
-            "hardware_connected": state_manager.backend_state not in [
-                BackendState.CONNECTING_HARDWARE,
-                BackendState.HARDWARE_DISCONNECTED
-            ]
-        }
-        
-        # Métricas del procesador de audio
-        audio_metrics = audio_processor.get_queue_status()
+        unified_metrics = await _POLL_CACHE.get_or_set(
+            "/metrics", _load_system_metrics, ttl=METRICS_CACHE_TTL
+        )
         
-        unified_metrics = {
-            "timestamp": datetime.now().isoformat(),
-            "hardware": hardware_metrics,
-            "backend": backend_metrics,
-            "audio_processing": audio_metrics
+        return {
+            "status": "success",
+            "metrics": unified_metrics
         }
         
-        return JSONResponse(
-            content={
-                "status": "success",
-                "metrics": unified_metrics
-            },
-            status_code=200
-        )
-        
     except Exception as e:
         logger.error(f"❌ Failed to get metrics: {e}")
         raise HTTPException(
@@ -571,10 +779,60 @@ async def get_system_metrics():
         )
 
 
+async def _load_system_metrics() -> Dict[str, Any]:
+    """Productor de caché para las métricas unificadas"""
+    state_manager = _STATE_MGR
+    audio_processor = _AUDIO_PROC
+    
+    # Métricas del hardware (red) y de la cola de audio (glob + stat en
+    # disco, en el threadpool) en paralelo
+    hardware_metrics, audio_metrics = await asyncio.gather(
+        state_manager.get_hardware_metrics(),
+        run_in_threadpool(audio_processor.get_queue_status),
+        return_exceptions=True
+    )
+    if isinstance(hardware_metrics, Exception):
+        hardware_metrics = {"error": str(hardware_metrics), "available": False}
+    if isinstance(audio_metrics, Exception):
+        raise audio_metrics
+    
+    # Métricas del backend local
+    backend_metrics = {
+        "backend_state": state_manager.backend_state.value,
+        "last_hardware_sync": state_manager.last_hardware_sync,
+        "hardware_connected": state_manager.hardware_connected
+    }
+    
+    unified_metrics = {
+        "timestamp": now_iso(),
+        "hardware": hardware_metrics,
+        "backend": backend_metrics,
+        "audio_processing": audio_metrics
+    }
+    return unified_metrics
+
+
 # ===============================================
 # ENDPOINTS DE CONFIGURACIÓN
 # ===============================================
 
+# Configuración básica por ahora (constante): se serializa una sola vez.
+# Si llega a ser dinámica, basta con reasignar _HARDWARE_CONFIG_BYTES
+HARDWARE_CONFIG = {
+    "backend_url": "http://backend:8000",
+    "sync_interval": 30,
+    "audio_auto_send": True,
+    "log_level": "INFO"
+}
+_HARDWARE_CONFIG_BYTES = orjson.dumps({
+    "status": "success",
+    "config": HARDWARE_CONFIG
+})
+# El hardware puede reutilizar la configuración durante este tiempo (segundos)
+HARDWARE_CONFIG_MAX_AGE = 60
+_HARDWARE_CONFIG_HEADERS = {"Cache-Control": f"public, max-age={HARDWARE_CONFIG_MAX_AGE}"}
+
+
 @router.get("/hardware/config")
 async def get_hardware_config():
     """
@@ -582,29 +840,13 @@ async def get_hardware_config():
     
     TODO: Implementar sistema de configuración
     """
-    try:
-        # Configuración básica por ahora
-        config = {
-            "backend_url": "http://backend:8000",
-            "sync_interval": 30,
-            "audio_auto_send": True,
-            "log_level": "INFO"
-        }
-        
-        return JSONResponse(
-            content={
-                "status": "success",
-                "config": config
-            },
-            status_code=200
-        )
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to get hardware config: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to get hardware config: {str(e)}"
-        )
+    # Response nueva por petición: FastAPI asigna .background a la respuesta
+    # devuelta, así que compartir una instancia entre peticiones no es seguro
+    return Response(
+        content=_HARDWARE_CONFIG_BYTES,
+        media_type="application/json",
+        headers=_HARDWARE_CONFIG_HEADERS
+    )
 
 
 @router.post("/config/update")
@@ -620,14 +862,11 @@ async def update_system_config(config: Dict[str, Any] = Body(...)):
         # Por ahora solo logeamos la configuración
         # En el futuro se implementará persistencia y aplicación
         
-        return JSONResponse(
-            content={
-                "status": "success",
-                "message": "Configuration update received (implementation pending)",
-                "config": config
-            },
-            status_code=200
-        )
+        return {
+            "status": "success",
+            "message": "Configuration update received (implementation pending)",
+            "config": config
+        }
         
     except Exception as e:
         logger.error(f"❌ Failed to update config: {e}")
@@ -651,24 +890,17 @@ async def get_audio_verification_status():
     try:
         logger.info("🔍 Getting audio verification status...")
         
-        audio_processor = get_audio_processor()
-        
-        # Obtener información de archivos de verificación
-        verification_info = await audio_processor.get_verification_files_info()
-        
-        # Obtener estado de la cola de procesamiento
-        queue_status = audio_processor.get_queue_status()
-        
-        return JSONResponse(
-            content={
-                "status": "success",
-                "verification": verification_info,
-                "processing_queue": queue_status,
-                "timestamp": datetime.now().isoformat()
-            },
-            status_code=200
+        view = await _POLL_CACHE.get_or_set(
+            "/audio/verification/status", _load_verification_status, ttl=VERIFICATION_CACHE_TTL
         )
         
+        return {
+            "status": "success",
+            "verification": view["verification"],
+            "processing_queue": view["queue"],
+            "timestamp": now_iso()
+        }
+        
     except Exception as e:
         logger.error(f"❌ Failed to get verification status: {e}")
         raise HTTPException(
@@ -677,6 +909,11 @@ async def get_audio_verification_status():
         )
 
 
+async def _load_verification_status() -> Dict[str, Any]:
+    """Productor de caché: archivos de verificación y estado de la cola en paralelo"""
+    return await _build_audio_view(("verification", "queue"))
+
+
 @router.get("/audio/verification/files")
 async def list_verification_files():
     """
@@ -685,18 +922,14 @@ async def list_verification_files():
     try:
         logger.info("📋 Listing audio verification files...")
         
-        audio_processor = get_audio_processor()
-        files_list = await audio_processor.list_verification_files()
-        
-        return JSONResponse(
-            content={
-                "status": "success",
-                "files": files_list,
-                "total_files": len(files_list),
-                "timestamp": datetime.now().isoformat()
-            },
-            status_code=200
-        )
+        files_list = (await _build_audio_view(("files",)))["files"]
+        
+        return {
+            "status": "success",
+            "files": files_list,
+            "total_files": len(files_list),
+            "timestamp": now_iso()
+        }
         
     except Exception as e:
         logger.error(f"❌ Failed to list verification files: {e}")
@@ -716,25 +949,19 @@ async def get_audio_processing_history():
     try:
         logger.info("📊 Getting audio processing history...")
         
-        audio_processor = get_audio_processor()
-        
         # Obtener estadísticas detalladas
-        processing_stats = audio_processor.get_processing_statistics()
-        queue_status = audio_processor.get_queue_status()
+        view = await _build_audio_view(("history", "queue"))
         
         history = {
-            "current_queue": queue_status,
-            "statistics": processing_stats,
-            "timestamp": datetime.now().isoformat()
+            "current_queue": view["queue"],
+            "statistics": view["history"],
+            "timestamp": now_iso()
         }
         
-        return JSONResponse(
-            content={
-                "status": "success",
-                "history": history
-            },
-            status_code=200
-        )
+        return {
+            "status": "success",
+            "history": history
+        }
         
     except Exception as e:
         logger.error(f"❌ Failed to get processing history: {e}")
@@ -744,6 +971,63 @@ async def get_audio_processing_history():
         )
 
 
+# Proyecciones de /audio/view: nombre -> productor sobre el AudioProcessor.
+# Los métodos síncronos recorren directorios y van al threadpool
+AUDIO_VIEW_PRODUCERS = {
+    "verification": lambda audio_processor: audio_processor.get_verification_files_info(),
+    "files": lambda audio_processor: audio_processor.list_verification_files(),
+    "history": lambda audio_processor: run_in_threadpool(audio_processor.get_processing_statistics),
+    "queue": lambda audio_processor: run_in_threadpool(audio_processor.get_queue_status)
+}
+
+
+async def _build_audio_view(fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Calcular en paralelo las proyecciones pedidas de AUDIO_VIEW_PRODUCERS"""
+    audio_processor = _AUDIO_PROC
+    results = await asyncio.gather(
+        *(AUDIO_VIEW_PRODUCERS[field](audio_processor) for field in fields)
+    )
+    return dict(zip(fields, results))
+
+
+@router.get("/audio/view")
+async def get_audio_view(fields: str = "verification,files,history,queue"):
+    """
+    Vista combinada de verificación, archivos, historial y cola de audio.
+    
+    Un dashboard obtiene en una sola petición lo que antes requería
+    /audio/verification/status, /audio/verification/files y
+    /audio/processing/history.
+    
+    Args:
+        fields: Lista separada por comas con las proyecciones a incluir
+    """
+    selected = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in selected if field not in AUDIO_VIEW_PRODUCERS]
+    if not selected or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields: {', '.join(unknown) or 'none selected'}. "
+                   f"Valid fields: {', '.join(AUDIO_VIEW_PRODUCERS)}"
+        )
+    
+    try:
+        view = await _build_audio_view(selected)
+        
+        return {
+            "status": "success",
+            **view,
+            "timestamp": now_iso()
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to build audio view: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to build audio view: {str(e)}"
+        )
+
+
 # ===============================================
 # ENDPOINTS DEL CLIENTE REMOTO
 # ===============================================
@@ -757,14 +1041,12 @@ async def get_remote_backend_status():
         Dict con información de estado, autenticación y conectividad
     """
     try:
-        from clients.remote_backend_client import get_remote_client
-        
         remote_client = get_remote_client()
         health_status = await remote_client.health_check()
         
         return {
             "success": True,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "remote_backend": health_status
         }
         
@@ -794,25 +1076,23 @@ async def test_remote_authentication():
     Útil para testing y diagnóstico de problemas de conexión.
     """
     try:
-        from clients.remote_backend_client import get_remote_client
-        
         remote_client = get_remote_client()
         
         # Forzar nueva autenticación
-        success = await remote_client._authenticate()
+        success = await remote_client._authenticate(force=True)
         
         if success:
             return {
                 "success": True,
                 "message": "Authentication successful",
-                "timestamp": datetime.now().isoformat(),
-                "token_expires_at": remote_client.token_expires_at.isoformat() if remote_client.token_expires_at else None
+                "timestamp": now_iso(),
+                "token_expires_at": remote_client.token_expires_at_iso
             }
         else:
             return {
                 "success": False,
                 "message": "Authentication failed",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
             
     except RuntimeError as e:
@@ -837,10 +1117,12 @@ async def test_remote_authentication():
 async def process_audio_legacy(audio: UploadFile = File(...)):
     """
     Compatibilidad con código anterior.
-    Redirige al nuevo endpoint de audio del hardware.
+    Comparte el flujo de recepción del endpoint de audio del hardware.
     """
-    logger.info("📎 Legacy audio processing endpoint called, redirecting...")
-    return await receive_audio_from_hardware(audio)
+    logger.info("📎 Legacy audio processing endpoint called")
+    return await _receive_audio_impl(
+        _iter_upload_chunks(audio), audio.filename, audio.content_type, "/audio/process"
+    )
 
 
 # ===============================================
@@ -853,20 +1135,19 @@ async def remote_backend_status():
     Verificar estado del cliente de backend remoto.
     """
     try:
-        from clients.remote_backend_client import get_remote_client
         remote_client = get_remote_client()
         
-        return JSONResponse(content={
+        return {
             "authenticated": remote_client.is_authenticated,
             "base_url": remote_client.base_url,
             "email": remote_client.email,
-            "token_expires_at": remote_client.token_expires_at.isoformat() if remote_client.token_expires_at else None,
+            "token_expires_at": remote_client.token_expires_at_iso,
             "status": "authenticated" if remote_client.is_authenticated else "not_authenticated"
-        })
+        }
         
     except Exception as e:
         logger.error(f"❌ Error checking remote backend status: {e}")
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "authenticated": False,
             "error": str(e),
             "status": "error"
@@ -879,20 +1160,20 @@ async def audio_queue_status():
     Obtener estado de la cola de procesamiento de audio.
     """
     try:
-        audio_processor = get_audio_processor()
-        queue_status = audio_processor.get_queue_status()
+        audio_processor = _AUDIO_PROC
+        queue_status = await run_in_threadpool(audio_processor.get_queue_status)
         
-        return JSONResponse(content={
+        return {
             "remote_available": audio_processor.remote_available,
             "is_processing": audio_processor.is_processing,
             "queue_size": len(audio_processor.processing_queue),
             "max_queue_size": audio_processor.max_queue_size,
             **queue_status
-        })
+        }
         
     except Exception as e:
         logger.error(f"❌ Error getting audio queue status: {e}")
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "error": str(e)
         }, status_code=500)
 
@@ -903,14 +1184,14 @@ async def audio_verification_info():
     Obtener información de archivos de verificación de audio.
     """
     try:
-        audio_processor = get_audio_processor()
+        audio_processor = _AUDIO_PROC
         verification_info = await audio_processor.get_verification_files_info()
         
-        return JSONResponse(content=verification_info)
+        return verification_info
         
     except Exception as e:
         logger.error(f"❌ Error getting verification info: {e}")
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "error": str(e)
         }, status_code=500)
 
@@ -921,17 +1202,17 @@ async def list_verification_files(limit: int = 50):
     Listar archivos de verificación de audio.
     """
     try:
-        audio_processor = get_audio_processor()
+        audio_processor = _AUDIO_PROC
         files_list = await audio_processor.list_verification_files(limit=limit)
         
-        return JSONResponse(content={
+        return {
             "files": files_list,
             "total_returned": len(files_list),
             "limit": limit
-        })
+        }
         
     except Exception as e:
         logger.error(f"❌ Error listing verification files: {e}")
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "error": str(e)
         }, status_code=500)
@@ -7,10 +7,49 @@ Consume la API REST implementada en puertocho-assistant-hardware.
 """
 
 import httpx
+import orjson
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import random
+import time
+from typing import Dict, Any, Optional, List, Tuple, TypeVar, Callable, Awaitable
+from pathlib import Path
+
+# Tamaño de bloque para descargas de audio en streaming
+AUDIO_STREAM_CHUNK_SIZE = 64 * 1024
+
+# TTL (segundos) de la caché de GETs del hardware. /state no se cachea: su
+# único lector es el sync, que debe ver los cambios hechos por el propio
+# hardware (botón, VAD) en cuanto llega el evento
+HARDWARE_CACHE_TTLS = {
+    "/health": 2.0,
+    "/metrics": 1.0
+}
+# Tiempo (segundos) que se recuerda un resultado negativo de disponibilidad
+UNAVAILABLE_PROBE_TTL = 0.5
+# Circuit breaker: fallos dentro de la ventana que abren el circuito
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_FAILURE_WINDOW = 10.0
+CIRCUIT_COOLDOWN = 2.0
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_T = TypeVar("_T")
+
+
+def _jbody(data: Any) -> Tuple[bytes, Dict[str, str]]:
+    """Serializar un body JSON con orjson (más rápido que json= de httpx)"""
+    return orjson.dumps(data), _JSON_HEADERS
+
+
+def _is_connection_refused(error: BaseException) -> bool:
+    """Comprobar si la causa raíz de un error de conexión es un ECONNREFUSED"""
+    while error is not None:
+        if isinstance(error, ConnectionRefusedError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
 
 
 class HardwareClient:
@@ -32,11 +71,30 @@ class HardwareClient:
         self.timeout = timeout
         self.retry_attempts = retry_attempts
         self.retry_delay = retry_delay
+        # Esperas de backoff exponencial precalculadas por intento
+        self._backoffs = tuple(retry_delay * (2 ** i) for i in range(retry_attempts))
+        
+        # Caché L1 de GETs consultados con frecuencia: endpoint -> (timestamp, valor)
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_ttls: Dict[str, float] = dict(HARDWARE_CACHE_TTLS)
+        self._unavailable_until = 0.0
+        
+        # Circuit breaker
+        self._consecutive_failures = 0
+        self._first_failure_at = 0.0
+        self._circuit_open_until = 0.0
         self.logger = logging.getLogger("hardware_client")
         
-        # Configurar cliente HTTP
+        # Configurar cliente HTTP: un único pool keep-alive para todas las
+        # llamadas concurrentes al hardware, con base_url ya resuelta
         self.session = httpx.AsyncClient(
-            timeout=httpx.Timeout(timeout),
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=32,
+                max_keepalive_connections=16,
+                keepalive_expiry=60.0
+            ),
+            timeout=httpx.Timeout(timeout, connect=2.0),
             headers={
                 "User-Agent": "PuertoCho-Backend-Gateway/1.0",
                 "Accept": "application/json"
@@ -47,62 +105,126 @@ class HardwareClient:
         """Cerrar sesión HTTP"""
         await self.session.aclose()
     
-    async def _make_request(
+    async def _json_request(self, method: str, endpoint: str, **kwargs) -> Any:
+        """
+        Realizar petición a un endpoint JSON y decodificar con orjson.
+        
+        Los GET de HARDWARE_CACHE_TTLS se sirven desde caché mientras estén
+        vigentes. El valor cacheado es compartido: tratarlo como solo lectura.
+        """
+        ttl = self._cache_ttls.get(endpoint) if method == "GET" else None
+        if ttl is not None:
+            entry = self._cache.get(endpoint)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+        
+        response = await self._request_with_retries(method, endpoint, **kwargs)
+        value = orjson.loads(response.content)
+        
+        if ttl is not None:
+            self._cache[endpoint] = (time.monotonic(), value)
+        return value
+    
+    async def _request_with_retries(
         self, 
         method: str, 
         endpoint: str, 
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> httpx.Response:
+        """Realizar petición HTTP con reintentos y manejo de errores."""
+        async def send() -> httpx.Response:
+            response = await self.session.request(method, endpoint, **kwargs)
+            response.raise_for_status()
+            return response
+        
+        response = await self._with_retries(method, endpoint, send)
+        self.logger.info(
+            "✅ Hardware API: %s %s -> %d", method.upper(), endpoint, response.status_code
+        )
+        return response
+    
+    async def _with_retries(
+        self,
+        method: str,
+        endpoint: str,
+        send: Callable[[], Awaitable[_T]]
+    ) -> _T:
         """
-        Realizar petición HTTP con reintentos y manejo de errores.
+        Ejecutar un intento de petición (send) con reintentos y circuit breaker.
+        
+        Un "connection refused" falla sin reintentar (el hardware está caído
+        o reiniciándose). Si se acumulan CIRCUIT_FAILURE_THRESHOLD fallos en
+        CIRCUIT_FAILURE_WINDOW segundos, el circuito se abre y las peticiones
+        fallan de inmediato durante CIRCUIT_COOLDOWN segundos.
         """
-        url = f"{self.base_url}{endpoint}"
+        if time.monotonic() < self._circuit_open_until:
+            raise Exception("Hardware circuit open: too many recent failures")
+        
+        method_upper = method.upper()
+        log_debug = self.logger.isEnabledFor(logging.DEBUG)
         
         for attempt in range(self.retry_attempts):
             try:
-                self.logger.debug(f"🔌 {method.upper()} {url} (attempt {attempt + 1})")
-                
-                response = await self.session.request(method, url, **kwargs)
-                response.raise_for_status()
-                
-                # Log successful request
-                self.logger.info(
-                    f"✅ Hardware API: {method.upper()} {endpoint} -> {response.status_code}"
-                )
+                if log_debug:
+                    self.logger.debug("🔌 %s %s (attempt %d)", method_upper, endpoint, attempt + 1)
                 
-                if response.headers.get("content-type", "").startswith("application/json"):
-                    return response.json()
-                else:
-                    return {"content": response.content, "headers": dict(response.headers)}
+                result = await send()
+                self._consecutive_failures = 0
+                return result
                     
             except httpx.TimeoutException:
-                self.logger.warning(f"⏰ Timeout in {method.upper()} {url} (attempt {attempt + 1})")
+                self.logger.warning("⏰ Timeout in %s %s (attempt %d)", method_upper, endpoint, attempt + 1)
                 if attempt == self.retry_attempts - 1:
+                    self._record_failure()
                     raise Exception(f"Hardware timeout after {self.retry_attempts} attempts")
                     
-            except httpx.ConnectError:
-                self.logger.warning(f"🔌 Connection error to {url} (attempt {attempt + 1})")
+            except httpx.ConnectError as e:
+                self.logger.warning("🔌 Connection error to %s (attempt %d)", endpoint, attempt + 1)
+                if _is_connection_refused(e):
+                    # El host responde pero nadie escucha: reintentar no ayuda
+                    self._record_failure()
+                    raise Exception("Hardware connection refused")
                 if attempt == self.retry_attempts - 1:
+                    self._record_failure()
                     raise Exception(f"Hardware connection failed after {self.retry_attempts} attempts")
                     
             except httpx.HTTPStatusError as e:
-                self.logger.error(f"❌ HTTP {e.response.status_code} in {method.upper()} {url}")
+                self.logger.error("❌ HTTP %d in %s %s", e.response.status_code, method_upper, endpoint)
                 if e.response.status_code >= 500:
                     # Retry on server errors
                     if attempt == self.retry_attempts - 1:
+                        self._record_failure()
                         raise Exception(f"Hardware server error: {e.response.status_code}")
                 else:
                     # Don't retry on client errors (4xx)
+                    self._consecutive_failures = 0
                     raise Exception(f"Hardware client error: {e.response.status_code} - {e.response.text}")
                     
             except Exception as e:
-                self.logger.error(f"❌ Unexpected error in {method.upper()} {url}: {e}")
+                self.logger.error("❌ Unexpected error in %s %s: %s", method_upper, endpoint, e)
                 if attempt == self.retry_attempts - 1:
+                    self._record_failure()
                     raise Exception(f"Hardware request failed: {str(e)}")
             
             # Wait before retry
             if attempt < self.retry_attempts - 1:
-                await asyncio.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+                await asyncio.sleep(self._backoffs[attempt])  # Exponential backoff
+    
+    def _record_failure(self):
+        """Contabilizar un fallo definitivo y abrir el circuito si procede"""
+        now = time.monotonic()
+        if self._consecutive_failures == 0 or now - self._first_failure_at > CIRCUIT_FAILURE_WINDOW:
+            self._consecutive_failures = 0
+            self._first_failure_at = now
+        self._consecutive_failures += 1
+        
+        if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            self._circuit_open_until = now + CIRCUIT_COOLDOWN
+            self._consecutive_failures = 0
+            self.logger.warning(
+                "⛔ Hardware circuit open for %.1fs after %d failures",
+                CIRCUIT_COOLDOWN, CIRCUIT_FAILURE_THRESHOLD
+            )
     
     # ===========================================
     # ENDPOINTS BÁSICOS (Health, State, etc.)
@@ -110,19 +232,16 @@ class HardwareClient:
     
     async def get_health(self) -> Dict[str, Any]:
         """GET /health - Verificar estado del servicio hardware"""
-        return await self._make_request("GET", "/health")
+        return await self._json_request("GET", "/health")
     
     async def get_state(self) -> Dict[str, Any]:
         """GET /state - Obtener estado actual del StateManager"""
-        return await self._make_request("GET", "/state")
+        return await self._json_request("GET", "/state")
     
     async def set_state(self, state: str) -> Dict[str, Any]:
         """POST /state - Cambiar estado manualmente (para testing)"""
-        return await self._make_request(
-            "POST", 
-            "/state", 
-            json={"state": state}
-        )
+        body, headers = _jbody({"state": state})
+        return await self._json_request("POST", "/state", content=body, headers=headers)
     
     # ===========================================
     # ENDPOINTS DE AUDIO
@@ -130,16 +249,47 @@ class HardwareClient:
     
     async def get_latest_audio(self) -> Dict[str, Any]:
         """GET /audio/capture - Obtener último archivo de audio capturado"""
-        return await self._make_request("GET", "/audio/capture")
+        return await self._json_request("GET", "/audio/capture")
     
-    async def download_audio(self, filename: str) -> bytes:
-        """GET /audio/download/{filename} - Descargar archivo de audio específico"""
-        response = await self._make_request("GET", f"/audio/download/{filename}")
-        return response.get("content", b"")
+    async def stream_audio(self, filename: str, sink_path: Path) -> int:
+        """
+        GET /audio/download/{filename} - Descargar audio directamente a disco.
+        
+        El cuerpo se escribe por bloques de AUDIO_STREAM_CHUNK_SIZE, así el
+        pico de memoria no depende del tamaño del audio. Usa los mismos
+        reintentos y circuit breaker que el resto de peticiones: un intento
+        fallido elimina el archivo parcial y la descarga vuelve a empezar.
+        
+        Returns:
+            Número de bytes escritos en sink_path
+        """
+        endpoint = f"/audio/download/{filename}"
+        
+        async def send() -> int:
+            written = 0
+            try:
+                async with self.session.stream("GET", endpoint) as response:
+                    if response.is_error:
+                        # Leer el cuerpo para que el error 4xx pueda incluirlo
+                        await response.aread()
+                    response.raise_for_status()
+                    with open(sink_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(AUDIO_STREAM_CHUNK_SIZE):
+                            f.write(chunk)
+                            written += len(chunk)
+            except BaseException:
+                # Error HTTP, de escritura o cancelación: no dejar un WAV truncado
+                sink_path.unlink(missing_ok=True)
+                raise
+            return written
+        
+        written = await self._with_retries("GET", endpoint, send)
+        self.logger.info("✅ Hardware API: GET %s -> %d bytes streamed", endpoint, written)
+        return written
     
     async def get_audio_status(self) -> Dict[str, Any]:
         """GET /audio/status - Estado de audio, VAD y grabación"""
-        return await self._make_request("GET", "/audio/status")
+        return await self._json_request("GET", "/audio/status")
     
     async def send_audio_to_backend(self, backend_url: Optional[str] = None, compress: bool = True) -> Dict[str, Any]:
         """POST /audio/send - Enviar audio al backend local (nosotros)"""
@@ -147,7 +297,8 @@ class HardwareClient:
         if backend_url:
             payload["backend_url"] = backend_url
             
-        return await self._make_request("POST", "/audio/send", json=payload)
+        body, headers = _jbody(payload)
+        return await self._json_request("POST", "/audio/send", content=body, headers=headers)
     
     # ===========================================
     # ENDPOINTS DE CONTROL DE HARDWARE
@@ -170,7 +321,8 @@ class HardwareClient:
         if brightness is not None:
             payload["brightness"] = brightness
             
-        return await self._make_request("POST", "/led/pattern", json=payload)
+        body, headers = _jbody(payload)
+        return await self._json_request("POST", "/led/pattern", content=body, headers=headers)
     
     async def simulate_button_press(
         self, 
@@ -182,47 +334,82 @@ class HardwareClient:
         if duration is not None:
             payload["duration"] = duration
             
-        return await self._make_request("POST", "/button/simulate", json=payload)
+        body, headers = _jbody(payload)
+        return await self._json_request("POST", "/button/simulate", content=body, headers=headers)
     
     async def get_metrics(self) -> Dict[str, Any]:
         """GET /metrics - Métricas del sistema (CPU, memoria, eventos)"""
-        return await self._make_request("GET", "/metrics")
+        return await self._json_request("GET", "/metrics")
     
     # ===========================================
     # MÉTODOS DE UTILIDAD
     # ===========================================
     
-    async def is_hardware_available(self) -> bool:
-        """Verificar si el hardware está disponible y respondiendo"""
+    async def is_hardware_available(self, max_age: float = 3.0) -> bool:
+        """
+        Verificar si el hardware está disponible y respondiendo.
+        
+        Reutiliza el último /health cacheado si tiene menos de max_age
+        segundos; si no, lanza una sonda ligera. Los resultados negativos
+        se recuerdan UNAVAILABLE_PROBE_TTL segundos para no saturar un
+        hardware inaccesible.
+        """
+        now = time.monotonic()
+        entry = self._cache.get("/health")
+        if entry is not None and now - entry[0] < max_age:
+            return entry[1].get("status") == "healthy"
+        
+        if now < self._unavailable_until:
+            return False
+        
+        available = await self._probe_health()
+        if not available:
+            self._unavailable_until = time.monotonic() + UNAVAILABLE_PROBE_TTL
+        return available
+    
+    async def _probe_health(self) -> bool:
+        """
+        Sonda ligera de /health: un único intento con timeout corto,
+        sin la pila de reintentos de _request_with_retries.
+        """
         try:
-            health = await self.get_health()
+            response = await self.session.get("/health", timeout=httpx.Timeout(0.5))
+            if response.status_code != 200:
+                return False
+            health = orjson.loads(response.content)
+            self._cache["/health"] = (time.monotonic(), health)
             return health.get("status") == "healthy"
         except Exception as e:
-            self.logger.warning(f"Hardware not available: {e}")
+            self.logger.debug(f"Hardware health probe failed: {e}")
             return False
     
     async def wait_for_hardware(self, max_wait_time: float = 60.0) -> bool:
         """
         Esperar a que el hardware esté disponible.
         
+        Sondea con backoff exponencial con jitter (0.25 s hasta 5 s) para
+        detectar rápido el arranque del hardware sin saturarlo si no está.
+        
         Args:
             max_wait_time: Tiempo máximo a esperar en segundos
             
         Returns:
             True si hardware está disponible, False si timeout
         """
-        start_time = datetime.now().timestamp()
-        check_interval = 5.0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait_time
+        delay = 0.25
         
         self.logger.info(f"🔍 Waiting for hardware at {self.base_url} (max {max_wait_time}s)")
         
-        while (datetime.now().timestamp() - start_time) < max_wait_time:
-            if await self.is_hardware_available():
+        while loop.time() < deadline:
+            if await self._probe_health():
                 self.logger.info("✅ Hardware is now available!")
                 return True
-                
-            self.logger.debug(f"⏳ Hardware not ready, checking again in {check_interval}s...")
-            await asyncio.sleep(check_interval)
+            
+            self.logger.debug(f"⏳ Hardware not ready, checking again in {delay:.2f}s...")
+            await asyncio.sleep(delay + random.random() * 0.1)
+            delay = min(delay * 1.7, 5.0)
         
         self.logger.error(f"❌ Hardware not available after {max_wait_time}s timeout")
         return False
@@ -260,10 +447,12 @@ class HardwareClient:
         self.logger.info("🔊 Sending audio to hardware for playback...")
         
         try:
-            response = await self._make_request(
+            body, headers = _jbody(audio_data)
+            response = await self._json_request(
                 "POST",
                 "/audio/play",
-                json=audio_data
+                content=body,
+                headers=headers
             )
             
             if response.get("success"):
@@ -10,11 +10,197 @@ import httpx
 import asyncio
 import logging
 import os
+import random
 import base64
-import json
-from typing import Dict, Any, Optional
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
+import orjson
+import websockets
+from websockets.exceptions import WebSocketException
+from typing import Dict, Any, Optional, Tuple, AsyncIterator, Union, Callable, Awaitable
 from datetime import datetime, timedelta
 
+# Tope (segundos) de la espera entre reintentos de envío
+RETRY_MAX_DELAY = 30.0
+# A partir de este tamaño (bytes) la respuesta JSON se decodifica fuera del
+# event loop: las respuestas con audio Base64 ocupan varios MB
+JSON_OFFLOAD_THRESHOLD = 256 * 1024
+# Margen mínimo de validez del token para reutilizarlo sin volver a autenticar
+AUTH_TOKEN_MIN_REMAINING = 30.0
+# Antelación (segundos) con la que se renueva el token antes de expirar
+TOKEN_REFRESH_MARGIN = 300
+# Renovaciones por 401 permitidas en cada envío. Es un presupuesto aparte del
+# de reintentos de red (retry_attempts): un token caducado no debe consumir
+# los reintentos reservados a timeouts y errores 5xx
+AUTH_RETRY_ATTEMPTS = 1
+# Canal WebSocket de conversación: tamaño de los frames binarios de audio y
+# tamaño máximo de un mensaje recibido (el resultado incluye audio Base64)
+WS_AUDIO_CHUNK_SIZE = 32 * 1024
+WS_MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+# Últimos resultados guardados por huella de envío para responder a un 304
+# (pocos: una respuesta conversacional puede traer varios MB de audio Base64)
+AUDIO_RESULT_CACHE_SIZE = 4
+
+
+# Un AsyncClient compartido por event loop: reutilizar el pool entre
+# instancias/reinicializaciones del cliente y no cruzar loops distintos
+_SESSIONS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _get_session(read_timeout: float) -> httpx.AsyncClient:
+    """
+    Obtener (o crear) el AsyncClient del event loop en curso.
+    
+    Args:
+        read_timeout: Timeout de lectura usado si hay que crear el cliente
+    """
+    loop = asyncio.get_running_loop()
+    session = _SESSIONS.get(loop)
+    if session is None or session.is_closed:
+        # Cliente HTTP con configuración extendida para audio
+        session = httpx.AsyncClient(
+            # HTTP/2 se negocia por ALPN solo con https://; con http:// (o si
+            # el servidor no lo anuncia) se sigue usando HTTP/1.1
+            http2=True,
+            timeout=httpx.Timeout(
+                connect=10.0,     # Timeout de conexión
+                read=read_timeout, # Timeout de lectura (para audio)
+                write=30.0,       # Timeout de escritura
+                pool=5.0          # Timeout del pool
+            ),
+            headers={
+                "User-Agent": "PuertoCho-Assistant-Backend/1.0",
+                "Accept": "application/json",
+                # httpx descomprime la respuesta (br requiere el paquete brotli)
+                "Accept-Encoding": "gzip, br"
+            },
+            follow_redirects=True,
+            # keepalive_expiry por debajo del timeout de keep-alive típico del
+            # servidor (75 s en nginx): entre envíos de audio espaciados la
+            # conexión sigue viva y no se repite el handshake TCP/TLS
+            limits=httpx.Limits(
+                max_keepalive_connections=10,
+                max_connections=20,
+                keepalive_expiry=60.0
+            )
+        )
+        _SESSIONS[loop] = session
+    return session
+
+
+async def _close_session():
+    """Cerrar el AsyncClient compartido del event loop en curso"""
+    session = _SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.aclose()
+
+
+def _build_multipart_body(
+    fields: Dict[str, Union[str, bytes]],
+    audio_data: bytes,
+    filename: str = "audio.wav",
+    content_type: str = "audio/wav"
+) -> Tuple[Tuple[bytes, ...], Dict[str, str]]:
+    """
+    Construir una vez el cuerpo multipart/form-data de un envío de audio.
+    
+    El audio no se copia: el cuerpo son las cabeceras de cada parte más el
+    propio objeto audio_data, reutilizable en todos los reintentos.
+    
+    Returns:
+        (partes del cuerpo, headers Content-Type/Content-Length)
+    """
+    boundary = os.urandom(16).hex()
+    dash_boundary = f"--{boundary}\r\n".encode("ascii")
+    
+    parts = []
+    for name, value in fields.items():
+        parts.append(dash_boundary)
+        parts.append(f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode("utf-8"))
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        parts.append(value + b"\r\n")
+    
+    parts.append(dash_boundary)
+    parts.append(
+        f'Content-Disposition: form-data; name="audio"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8")
+    )
+    parts.append(audio_data)
+    parts.append(f"\r\n--{boundary}--\r\n".encode("ascii"))
+    
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(sum(len(part) for part in parts))
+    }
+    return tuple(parts), headers
+
+
+async def _decode_json_body(content: bytes) -> Any:
+    """Decodificar una respuesta JSON con orjson, en un hilo si es grande"""
+    if len(content) >= JSON_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(orjson.loads, content)
+    return orjson.loads(content)
+
+
+def _audio_digest(audio_data: bytes, fields: Dict[str, Union[str, bytes]]) -> str:
+    """
+    Huella blake2b de un envío: audio más campos del formulario.
+    
+    Se calcula una vez por envío, fuera del bucle de reintentos.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name, value in fields.items():
+        digest.update(name.encode("utf-8"))
+        digest.update(value.encode("utf-8") if isinstance(value, str) else value)
+        digest.update(b"\0")
+    digest.update(audio_data)
+    return digest.hexdigest()
+
+
+class _PrebuiltBody:
+    """
+    Cuerpo prearmado que httpx puede recorrer varias veces.
+    
+    A diferencia de un generador asíncrono, cada iteración empieza de cero:
+    sirve para todos los reintentos y para el reenvío tras un 401.
+    """
+    
+    def __init__(self, parts: Tuple[bytes, ...]):
+        self._parts = parts
+    
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for part in self._parts:
+            yield part
+
+
+class _BearerTokenAuth(httpx.Auth):
+    """
+    Autenticación Bearer del cliente remoto.
+    
+    Ante un 401 renueva el token (renovación con lock y doble comprobación)
+    y reenvía la petición con el token nuevo. Se crea una instancia por envío:
+    el presupuesto de renovaciones se comparte entre todos sus reintentos.
+    """
+    
+    def __init__(self, client: "RemoteBackendClient", retries: int = AUTH_RETRY_ATTEMPTS):
+        self._client = client
+        self._retries_left = retries
+    
+    async def async_auth_flow(self, request: httpx.Request):
+        token = self._client.access_token
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        
+        if response.status_code == 401 and self._retries_left > 0:
+            self._retries_left -= 1
+            self._client.logger.warning("🔒 Token rejected by remote backend, refreshing...")
+            if await self._client._refresh_auth_token(token):
+                request.headers["Authorization"] = f"Bearer {self._client.access_token}"
+                yield request
+
 
 class RemoteBackendClient:
     """
@@ -41,6 +227,20 @@ class RemoteBackendClient:
         self.default_language = os.getenv("REMOTE_BACKEND_LANGUAGE", "es")
         self.api_mode = os.getenv("REMOTE_BACKEND_API_MODE", "conversation")  # conversation|pipeline
         
+        # URLs de los endpoints, resueltas una sola vez
+        self._login_url = f"{self.base_url}/api/auth/login"
+        self._refresh_url = f"{self.base_url}/api/auth/refresh"
+        self._process_url = f"{self.base_url}/api/audio/process"
+        self._conversation_url = f"{self.base_url}{self.conversation_path}"
+        self._health_url = f"{self.base_url}/health"
+        
+        # Canal persistente opcional (WebSocket) para la conversación: sube el
+        # audio por trozos y recibe texto parcial mientras el remoto genera la
+        # respuesta. Vacío = desactivado; el POST multipart queda de respaldo
+        self.ws_url = os.getenv("REMOTE_BACKEND_WS_URL", "")
+        self._ws: Optional[websockets.WebSocketClientProtocol] = None
+        self._ws_lock = asyncio.Lock()
+        
         # Configuración de timeouts y reintentos
         self.timeout = float(os.getenv("REMOTE_BACKEND_TIMEOUT", "60.0"))
         self.retry_attempts = int(os.getenv("REMOTE_BACKEND_RETRY_ATTEMPTS", "3"))
@@ -48,32 +248,47 @@ class RemoteBackendClient:
         
         # Estado de autenticación
         self.access_token: Optional[str] = None
-        self.token_expires_at: Optional[datetime] = None
+        # Momento de renovación en reloj monotónico (inmune a ajustes de NTP o
+        # suspensiones); la versión ISO es solo para logs y endpoints de estado
+        self._token_refresh_at: Optional[float] = None
+        self.token_expires_at_iso: Optional[str] = None
+        self._token_fingerprint: Optional[str] = None
         self.refresh_token: Optional[str] = None
         self.is_authenticated = False
         
-        # Cliente HTTP con configuración extendida para audio
-        self.session = httpx.AsyncClient(
-            timeout=httpx.Timeout(
-                connect=10.0,     # Timeout de conexión
-                read=self.timeout, # Timeout de lectura (para audio)
-                write=30.0,       # Timeout de escritura
-                pool=5.0          # Timeout del pool
-            ),
-            headers={
-                "User-Agent": "PuertoCho-Assistant-Backend/1.0",
-                "Accept": "application/json"
-            },
-            follow_redirects=True,
-            limits=httpx.Limits(
-                max_keepalive_connections=5,
-                max_connections=10
-            )
-        )
+        # Una sola autenticación/renovación en vuelo; la generación permite a
+        # los llamadores que esperaban el lock reutilizar el login recién hecho
+        self._auth_lock = asyncio.Lock()
+        self._auth_generation = 0
+        
+        # Envíos simultáneos: cada uno retiene el audio y su cuerpo multipart
+        # durante todos sus intentos, así que la memoria de subidas en vuelo
+        # queda acotada a max_inflight × tamaño máximo de audio
+        self.max_inflight = max(1, int(os.getenv("REMOTE_BACKEND_MAX_INFLIGHT", "2")))
+        self._send_sem = asyncio.Semaphore(self.max_inflight)
+        
+        # Resultados recientes por huella (X-Audio-Digest): si se repite un
+        # envío se pide con If-None-Match y un 304 devuelve el guardado
+        self._result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         
         # Task de renovación automática de token
         self.auth_refresh_task: Optional[asyncio.Task] = None
-        self._shutdown_requested = False
+        self._shutdown_event = asyncio.Event()
+    
+    def _backoff(self, attempt: int) -> float:
+        """
+        Espera antes del siguiente reintento: exponencial con jitter y tope.
+        
+        El jitter evita que varios clientes reintenten a la vez contra un
+        backend que se está recuperando.
+        """
+        upper = min(RETRY_MAX_DELAY, self.retry_delay * 2 ** (attempt + 1))
+        return random.uniform(self.retry_delay, max(self.retry_delay, upper))
+    
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """AsyncClient compartido del event loop en curso (creado al primer uso)"""
+        return _get_session(self.timeout)
         
     async def start(self):
         """Inicializar cliente y autenticación"""
@@ -90,6 +305,10 @@ class RemoteBackendClient:
             # Iniciar renovación automática de token
             self.auth_refresh_task = asyncio.create_task(self._auto_refresh_token())
             
+            # Abrir el canal de conversación si está configurado (no es fatal)
+            if self.ws_url:
+                await self._open_channel()
+            
             self.logger.info("✅ Remote Backend Client started successfully")
             
         except Exception as e:
@@ -100,28 +319,58 @@ class RemoteBackendClient:
         """Detener cliente y limpiar recursos"""
         self.logger.info("🛑 Stopping Remote Backend Client...")
         
-        self._shutdown_requested = True
+        # Despierta al instante a la tarea de renovación si está esperando
+        self._shutdown_event.set()
         
-        # Cancelar tarea de renovación
+        # Cancelar tarea de renovación solo si está en mitad de una petición
         if self.auth_refresh_task and not self.auth_refresh_task.done():
-            self.auth_refresh_task.cancel()
-            try:
-                await self.auth_refresh_task
-            except asyncio.CancelledError:
-                pass
+            done, _ = await asyncio.wait({self.auth_refresh_task}, timeout=1.0)
+            if not done:
+                self.auth_refresh_task.cancel()
+                try:
+                    await self.auth_refresh_task
+                except asyncio.CancelledError:
+                    pass
         
-        # Cerrar sesión HTTP
-        await self.session.aclose()
+        # Cerrar canal WebSocket y sesión HTTP compartida
+        await self._close_channel()
+        await _close_session()
         
         self.logger.info("✅ Remote Backend Client stopped")
         
-    async def _authenticate(self) -> bool:
+    async def _authenticate(self, force: bool = False) -> bool:
         """
         Autenticar con el backend remoto usando email/password.
         
+        Las llamadas concurrentes se serializan y comparten el resultado:
+        si el token vigente aún es válido (o otro llamador acaba de
+        autenticarse) no se repite el login.
+        
+        Args:
+            force: Hacer login aunque el token actual siga siendo válido
+        
         Returns:
             bool: True si la autenticación fue exitosa
         """
+        generation = self._auth_generation
+        async with self._auth_lock:
+            if self.is_authenticated and self._auth_generation != generation:
+                return True
+            if not force and self._has_valid_token():
+                return True
+            return await self._login()
+    
+    def _has_valid_token(self) -> bool:
+        """Comprobar si el token actual sigue vigente con margen suficiente"""
+        return (
+            self.is_authenticated
+            and self.access_token is not None
+            and self._token_refresh_at is not None
+            and self._token_refresh_at - time.monotonic() > AUTH_TOKEN_MIN_REMAINING
+        )
+    
+    async def _login(self) -> bool:
+        """Login con email/password (llamar con _auth_lock adquirido)"""
         try:
             self.logger.info("🔐 Authenticating with remote backend...")
             
@@ -131,8 +380,8 @@ class RemoteBackendClient:
             }
             
             response = await self.session.post(
-                f"{self.base_url}/api/auth/login",
-                json=auth_payload,
+                self._login_url,
+                content=orjson.dumps(auth_payload),
                 headers={"Content-Type": "application/json"}
             )
             
@@ -140,7 +389,7 @@ class RemoteBackendClient:
                 auth_data = response.json()
                 
                 # Extraer tokens
-                self.access_token = auth_data.get("access_token") or auth_data.get("token")
+                self._set_access_token(auth_data.get("access_token") or auth_data.get("token"))
                 self.refresh_token = auth_data.get("refresh_token")
                 
                 if not self.access_token:
@@ -149,15 +398,15 @@ class RemoteBackendClient:
                 
                 # Calcular expiración del token
                 expires_in = auth_data.get("expires_in", 3600)  # Default 1 hora
-                self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 300)  # Renovar 5 min antes
+                self._set_token_expiry(expires_in)
                 
                 self.is_authenticated = True
+                self._auth_generation += 1
                 
                 self.logger.info("✅ Authentication successful")
-                self.logger.info(f"🔑 Access token: {self.access_token[:20]}...{self.access_token[-10:] if len(self.access_token) > 30 else self.access_token}")
-                self.logger.info(f"🕒 Token expires at: {self.token_expires_at}")
-                if self.refresh_token:
-                    self.logger.info(f"🔄 Refresh token available: {self.refresh_token[:15]}...{self.refresh_token[-5:] if len(self.refresh_token) > 20 else self.refresh_token}")
+                self.logger.info("🔑 Access token %s, expires at %s, refresh token %s",
+                                 self._token_fingerprint, self.token_expires_at_iso,
+                                 "available" if self.refresh_token else "not available")
                 
                 return True
                 
@@ -182,92 +431,283 @@ class RemoteBackendClient:
             self.logger.error(f"❌ Authentication error: {e}")
             return False
             
-    async def _refresh_auth_token(self) -> bool:
+    async def _refresh_auth_token(self, rejected_token: Optional[str] = None) -> bool:
         """
         Renovar token de autenticación usando refresh_token.
         
+        Doble comprobación dentro del lock: si otro llamador ya renovó el
+        token mientras se esperaba, no se vuelve a gastar el refresh_token
+        (con refresh tokens rotativos el segundo intento invalidaría la sesión).
+        
+        Args:
+            rejected_token: Token que el backend acaba de rechazar con 401;
+                si ya no es el vigente, la renovación ya se hizo
+        
         Returns:
             bool: True si la renovación fue exitosa
         """
+        generation = self._auth_generation
+        async with self._auth_lock:
+            if self.is_authenticated and self._auth_generation != generation:
+                return True
+            if rejected_token is not None:
+                if self.is_authenticated and self.access_token != rejected_token:
+                    return True
+            elif self._has_valid_token():
+                return True
+            return await self._refresh_locked()
+    
+    async def _refresh_locked(self) -> bool:
+        """Renovación del token (llamar con _auth_lock adquirido)"""
         try:
             if not self.refresh_token:
                 self.logger.info("🔄 No refresh token available, re-authenticating...")
-                return await self._authenticate()
+                return await self._login()
                 
             self.logger.info("🔄 Refreshing authentication token...")
-            self.logger.info(f"🕒 Current token expires at: {self.token_expires_at}")
+            self.logger.info(f"🕒 Current token expires at: {self.token_expires_at_iso}")
             
             response = await self.session.post(
-                f"{self.base_url}/api/auth/refresh",
-                json={"refresh_token": self.refresh_token}
+                self._refresh_url,
+                content=orjson.dumps({"refresh_token": self.refresh_token}),
+                headers={"Content-Type": "application/json"}
             )
             
             if response.status_code == 200:
                 auth_data = response.json()
                 
-                self.access_token = auth_data.get("access_token") or auth_data.get("token")
+                new_token = auth_data.get("access_token") or auth_data.get("token")
+                if not new_token:
+                    self.logger.warning("⚠️ Token refresh returned no access token, re-authenticating...")
+                    return await self._login()
+                
+                self._set_access_token(new_token)
                 new_refresh = auth_data.get("refresh_token")
                 if new_refresh:
                     self.refresh_token = new_refresh
                 
                 expires_in = auth_data.get("expires_in", 3600)
-                self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 300)
+                self._set_token_expiry(expires_in)
+                self._auth_generation += 1
                 
                 self.logger.info("✅ Token refreshed successfully")
-                self.logger.info(f"🔑 New access token: {self.access_token[:20]}...{self.access_token[-10:] if len(self.access_token) > 30 else self.access_token}")
-                self.logger.info(f"🕒 New expiration time: {self.token_expires_at}")
+                self.logger.info("🔑 New access token %s, expires at %s",
+                                 self._token_fingerprint, self.token_expires_at_iso)
                 return True
             else:
                 self.logger.warning(f"⚠️ Token refresh failed with status {response.status_code}, re-authenticating...")
-                return await self._authenticate()
+                return await self._login()
                 
         except Exception as e:
             self.logger.error(f"❌ Token refresh error: {e}")
             self.logger.info("🔄 Falling back to full re-authentication...")
-            return await self._authenticate()
+            return await self._login()
             
+    async def _wait_for_shutdown(self, timeout: float) -> bool:
+        """Esperar hasta timeout segundos; True si se pidió el cierre entretanto"""
+        try:
+            await asyncio.wait_for(self._shutdown_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
     async def _auto_refresh_token(self):
         """Task en background para renovar token automáticamente"""
-        while not self._shutdown_requested:
+        while not self._shutdown_event.is_set():
             try:
-                if self.token_expires_at:
+                if self._token_refresh_at is not None:
                     # Calcular tiempo hasta renovación
-                    time_until_refresh = (self.token_expires_at - datetime.now()).total_seconds()
+                    time_until_refresh = self._token_refresh_at - time.monotonic()
                     
                     if time_until_refresh > 0:
                         sleep_time = min(time_until_refresh, 300)  # Max 5 min
-                        next_refresh = datetime.now() + timedelta(seconds=sleep_time)
-                        self.logger.debug(f"🔄 Next token refresh check scheduled for: {next_refresh}")
+                        self.logger.debug("🔄 Next token refresh check in %.0f seconds", sleep_time)
                         
-                        # Esperar hasta que sea momento de renovar
-                        await asyncio.sleep(sleep_time)
+                        # Esperar hasta que sea momento de renovar (o al cierre)
+                        if await self._wait_for_shutdown(sleep_time):
+                            break
+                        continue
                     
-                    if not self._shutdown_requested:
-                        self.logger.info("🔄 Token refresh time reached, refreshing...")
-                        await self._refresh_auth_token()
+                    self.logger.info("🔄 Token refresh time reached, refreshing...")
+                    if not await self._refresh_auth_token():
+                        # La hora de renovación sigue vencida: no reintentar en bucle
+                        if await self._wait_for_shutdown(60):
+                            break
                 else:
                     # Sin token, esperar y reintentar autenticación
-                    await asyncio.sleep(60)
-                    if not self._shutdown_requested:
-                        await self._authenticate()
+                    if await self._wait_for_shutdown(60):
+                        break
+                    await self._authenticate()
                         
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"❌ Error in auto refresh task: {e}")
-                await asyncio.sleep(60)
+                if await self._wait_for_shutdown(60):
+                    break
                 
+    def _set_access_token(self, token: Optional[str]):
+        """
+        Asignar el access_token junto con su huella para los logs.
+        
+        La huella se calcula una sola vez por token; los logs nunca
+        muestran el token ni fragmentos de él.
+        """
+        self.access_token = token
+        self._token_fingerprint = (
+            hashlib.blake2s(token.encode(), digest_size=6).hexdigest() if token else None
+        )
+    
+    def _set_token_expiry(self, expires_in: float):
+        """Programar la renovación TOKEN_REFRESH_MARGIN segundos antes de expirar"""
+        self._token_refresh_at = time.monotonic() + expires_in - TOKEN_REFRESH_MARGIN
+        self.token_expires_at_iso = (
+            datetime.now() + timedelta(seconds=expires_in - TOKEN_REFRESH_MARGIN)
+        ).isoformat()
+    
+    def _token_usable(self) -> bool:
+        """Camino rápido (síncrono): hay token y no ha llegado su hora de renovación"""
+        return (
+            self.is_authenticated
+            and self.access_token is not None
+            and (self._token_refresh_at is None or time.monotonic() < self._token_refresh_at)
+        )
+    
     async def _ensure_authenticated(self) -> bool:
-        """Asegurar que tenemos un token válido"""
+        """
+        Asegurar que tenemos un token válido.
+        
+        Los envíos comprueban antes _token_usable() y solo llegan aquí si hace
+        falta autenticar o renovar. La comprobación de expiración se mantiene
+        en lugar de esperar al 401: con audio, un 401 obliga a subirlo dos veces.
+        """
         if not self.is_authenticated or not self.access_token:
             return await self._authenticate()
             
         # Verificar si el token expira pronto
-        if self.token_expires_at and datetime.now() >= self.token_expires_at:
+        if self._token_refresh_at is not None and time.monotonic() >= self._token_refresh_at:
             return await self._refresh_auth_token()
             
         return True
         
+    def _prepare_dedup(
+        self,
+        audio_data: bytes,
+        fields: Dict[str, Union[str, bytes]],
+        headers: Dict[str, str]
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Añadir a los headers la huella del envío (y If-None-Match si ya hay
+        un resultado guardado para ella).
+        
+        Returns:
+            (huella, resultado guardado o None)
+        """
+        digest = _audio_digest(audio_data, fields)
+        headers["X-Audio-Digest"] = digest
+        cached = self._result_cache.get(digest)
+        if cached is not None:
+            headers["If-None-Match"] = f'"{digest}"'
+        return digest, cached
+    
+    def _remember_result(self, digest: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Guardar el resultado de un envío (LRU acotada) y devolverlo"""
+        self._result_cache[digest] = result
+        self._result_cache.move_to_end(digest)
+        while len(self._result_cache) > AUDIO_RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+        return result
+    
+    async def _open_channel(self) -> bool:
+        """Abrir (o reutilizar) el canal WebSocket persistente con el remoto"""
+        if self._ws is not None and not self._ws.closed:
+            return True
+        
+        try:
+            self._ws = await websockets.connect(
+                self.ws_url,
+                extra_headers={"Authorization": f"Bearer {self.access_token}"},
+                max_size=WS_MAX_MESSAGE_SIZE,
+                open_timeout=10.0
+            )
+            self.logger.info(f"🔌 Remote streaming channel connected: {self.ws_url}")
+            return True
+        except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+            self.logger.warning(f"⚠️ Remote streaming channel unavailable, using HTTP: {e}")
+            self._ws = None
+            return False
+    
+    async def _close_channel(self):
+        """Cerrar el canal WebSocket si está abierto"""
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            await ws.close()
+    
+    async def _converse_over_channel(
+        self,
+        fields: Dict[str, str],
+        audio_data: bytes,
+        on_partial: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Enviar una conversación por el canal WebSocket.
+        
+        Protocolo: un frame de texto {"type": "audio.start", ...campos del
+        multipart}, el audio en frames binarios y {"type": "audio.end"}. El
+        remoto contesta con cero o más {"type": "partial", "text": ...} y un
+        {"type": "result", ...} con el mismo contenido que la respuesta JSON del
+        POST, o {"type": "error", "error": ...}.
+        
+        Returns:
+            Resultado con el formato de send_audio_for_conversation, o None si
+            el canal no está disponible y hay que usar el POST
+        """
+        # Una conversación a la vez por conexión
+        async with self._ws_lock:
+            if not await self._open_channel():
+                return None
+            ws = self._ws
+            # Solo una respuesta terminal (result/error) deja el canal limpio;
+            # cualquier otra salida (fallo, cancelación, excepción de
+            # on_partial) lo cierra para que la siguiente conversación no lea
+            # frames pendientes de esta
+            finished = False
+            
+            try:
+                await ws.send(orjson.dumps({"type": "audio.start", **fields}).decode())
+                audio_view = memoryview(audio_data)
+                for offset in range(0, len(audio_view), WS_AUDIO_CHUNK_SIZE):
+                    await ws.send(audio_view[offset:offset + WS_AUDIO_CHUNK_SIZE])
+                await ws.send('{"type": "audio.end"}')
+                
+                while True:
+                    event = await _decode_json_body(
+                        await asyncio.wait_for(ws.recv(), timeout=self.timeout)
+                    )
+                    if not isinstance(event, dict):
+                        self.logger.warning(f"⚠️ Unexpected streaming channel frame, falling back to HTTP: {event!r}")
+                        return None
+                    event_type = event.pop("type", None)
+                    
+                    if event_type == "partial":
+                        if on_partial is not None:
+                            await on_partial(event)
+                    elif event_type == "result":
+                        finished = True
+                        self.logger.info("✅ Conversation response received (streaming channel)")
+                        return {"success": True, **event}
+                    elif event_type == "error":
+                        finished = True
+                        return {"success": False, "error": event.get("error", "Unknown error")}
+                    
+            except (OSError, asyncio.TimeoutError, WebSocketException, orjson.JSONDecodeError) as e:
+                # Estado del canal desconocido: se descarta y se reabre en el próximo envío
+                self.logger.warning(f"⚠️ Streaming channel failed, falling back to HTTP: {e!r}")
+                return None
+            finally:
+                if not finished:
+                    await self._close_channel()
+    
     async def send_audio_for_processing(
         self, 
         audio_data: bytes,
@@ -295,128 +735,124 @@ class RemoteBackendClient:
             }
         """
         # Asegurar autenticación válida
-        if not await self._ensure_authenticated():
+        if not (self._token_usable() or await self._ensure_authenticated()):
             return {
                 "success": False,
                 "error": "Failed to authenticate with remote backend"
             }
         
-        for attempt in range(self.retry_attempts):
-            try:
-                self.logger.info(f"📡 Sending audio to remote backend (attempt {attempt + 1})...")
-                self.logger.info(f"🔑 Using token: {self.access_token[:20]}...{self.access_token[-10:] if len(self.access_token) > 30 else self.access_token}")
-                self.logger.info(f"🕒 Token expires at: {self.token_expires_at}")
-                
-                # Preparar headers de autenticación
-                headers = {
-                    "Authorization": f"Bearer {self.access_token}"
-                }
-                
-                # Preparar archivo de audio
-                files = {
-                    "audio": ("audio.wav", audio_data, "audio/wav")
-                }
-                
-                # Preparar metadata y contexto como campos del formulario
-                form_data = {
-                    "metadata": json.dumps(metadata),
-                    "context": json.dumps(context or {})
-                }
-                
-                # Enviar petición multipart/form-data
-                response = await self.session.post(
-                    f"{self.base_url}/api/audio/process",
-                    files=files,
-                    data=form_data,
-                    headers=headers
-                )
-                
-                # Manejar respuesta de autenticación expirada
-                if response.status_code == 401:
-                    self.logger.warning(f"🔒 Token expired during request (attempt {attempt + 1}), refreshing...")
-                    if await self._refresh_auth_token():
-                        continue  # Reintentar con nuevo token
-                    else:
+        async with self._send_sem:
+            # Cuerpo multipart armado una sola vez para todos los intentos
+            fields = {
+                "metadata": orjson.dumps(metadata),
+                "context": orjson.dumps(context or {})
+            }
+            body_parts, body_headers = _build_multipart_body(fields, audio_data)
+            digest, cached = self._prepare_dedup(audio_data, fields, body_headers)
+            body = _PrebuiltBody(body_parts)
+            auth = _BearerTokenAuth(self)
+            
+            for attempt in range(self.retry_attempts):
+                try:
+                    self.logger.info("📡 Sending audio to remote backend (attempt %d)...", attempt + 1)
+                    self.logger.debug("🔑 Using token %s", self._token_fingerprint)
+                    
+                    # Enviar petición multipart/form-data (auth añade el token y
+                    # gestiona el 401 → renovación → reenvío)
+                    response = await self.session.post(
+                        self._process_url,
+                        content=body,
+                        headers=body_headers,
+                        auth=auth
+                    )
+                    
+                    # 401 con el presupuesto de renovación agotado
+                    if response.status_code == 401:
                         return {
                             "success": False,
                             "error": "Authentication expired and refresh failed"
                         }
-                
-                # Verificar respuesta exitosa
-                if response.status_code == 200:
-                    result = response.json()
                     
-                    self.logger.info(f"✅ Remote backend response received")
-                    self.logger.info(f"Response type: {result.get('response_type', 'unknown')}")
+                    # Mismo envío ya procesado: el remoto no repite el trabajo
+                    if response.status_code == 304 and cached is not None:
+                        self.logger.info("♻️ Remote backend reports duplicate audio, reusing previous result")
+                        return cached
                     
-                    if result.get("text"):
-                        self.logger.info(f"Text response: {result['text'][:100]}...")
-                    
-                    return {
-                        "success": True,
-                        **result
-                    }
-                else:
-                    error_detail = "Unknown error"
-                    try:
-                        error_data = response.json()
-                        error_detail = error_data.get("detail", error_data.get("message", str(error_data)))
-                    except:
-                        error_detail = response.text
-                    
-                    self.logger.error(f"❌ Remote backend error ({response.status_code}): {error_detail}")
-                    
-                    # No reintentar errores 4xx (excepto 401 ya manejado)
-                    if 400 <= response.status_code < 500:
+                    # Verificar respuesta exitosa
+                    if response.status_code == 200:
+                        result = await _decode_json_body(response.content)
+                        
+                        self.logger.info(f"✅ Remote backend response received")
+                        self.logger.info(f"Response type: {result.get('response_type', 'unknown')}")
+                        
+                        if result.get("text"):
+                            self.logger.info(f"Text response: {result['text'][:100]}...")
+                        
+                        return self._remember_result(digest, {
+                            "success": True,
+                            **result
+                        })
+                    else:
+                        error_detail = "Unknown error"
+                        try:
+                            error_data = response.json()
+                            error_detail = error_data.get("detail", error_data.get("message", str(error_data)))
+                        except:
+                            error_detail = response.text
+                        
+                        self.logger.error(f"❌ Remote backend error ({response.status_code}): {error_detail}")
+                        
+                        # No reintentar errores 4xx (excepto 401 ya manejado)
+                        if 400 <= response.status_code < 500:
+                            return {
+                                "success": False,
+                                "error": f"Backend error {response.status_code}: {error_detail}"
+                            }
+                        
+                        # Reintentar errores 5xx
+                        if attempt < self.retry_attempts - 1:
+                            await asyncio.sleep(self._backoff(attempt))
+                            continue
+                        
                         return {
                             "success": False,
-                            "error": f"Backend error {response.status_code}: {error_detail}"
+                            "error": f"Backend error after {self.retry_attempts} attempts: {error_detail}"
                         }
-                    
-                    # Reintentar errores 5xx
+                        
+                except httpx.TimeoutException:
+                    self.logger.error(f"❌ Timeout sending audio to remote backend (attempt {attempt + 1})")
                     if attempt < self.retry_attempts - 1:
-                        await asyncio.sleep(self.retry_delay * (attempt + 1))
+                        await asyncio.sleep(self._backoff(attempt))
                         continue
+                    return {
+                        "success": False,
+                        "error": "Timeout communicating with remote backend"
+                    }
                     
+                except httpx.ConnectError:
+                    self.logger.error(f"❌ Connection error to remote backend (attempt {attempt + 1})")
+                    if attempt < self.retry_attempts - 1:
+                        await asyncio.sleep(self._backoff(attempt))
+                        continue
                     return {
                         "success": False,
-                        "error": f"Backend error after {self.retry_attempts} attempts: {error_detail}"
+                        "error": "Cannot connect to remote backend"
                     }
                     
-            except httpx.TimeoutException:
-                self.logger.error(f"❌ Timeout sending audio to remote backend (attempt {attempt + 1})")
-                if attempt < self.retry_attempts - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                return {
-                    "success": False,
-                    "error": "Timeout communicating with remote backend"
-                }
-                
-            except httpx.ConnectError:
-                self.logger.error(f"❌ Connection error to remote backend (attempt {attempt + 1})")
-                if attempt < self.retry_attempts - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                return {
-                    "success": False,
-                    "error": "Cannot connect to remote backend"
-                }
-                
-            except Exception as e:
-                self.logger.error(f"❌ Unexpected error sending audio (attempt {attempt + 1}): {e}")
-                if attempt < self.retry_attempts - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                return {
-                    "success": False,
-                    "error": f"Unexpected error: {str(e)}"
-                }
-        
-        return {
-            "success": False,
-            "error": f"Failed after {self.retry_attempts} attempts"
-        }
+                except Exception as e:
+                    self.logger.error(f"❌ Unexpected error sending audio (attempt {attempt + 1}): {e}")
+                    if attempt < self.retry_attempts - 1:
+                        await asyncio.sleep(self._backoff(attempt))
+                        continue
+                    return {
+                        "success": False,
+                        "error": f"Unexpected error: {str(e)}"
+                    }
+            
+            return {
+                "success": False,
+                "error": f"Failed after {self.retry_attempts} attempts"
+            }
         
     async def send_audio_for_conversation(
         self,
@@ -426,6 +862,7 @@ class RemoteBackendClient:
         language: Optional[str] = None,
         metadata_json: Optional[str] = None,
         generate_audio_response: bool = True,
+        on_partial: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
     ) -> Dict[str, Any]:
         """
         Enviar audio al endpoint conversacional del backend remoto.
@@ -437,110 +874,115 @@ class RemoteBackendClient:
         - language (string)
         - generateAudioResponse (boolean)
         - metadata (string JSON)
+        
+        Con REMOTE_BACKEND_WS_URL configurada se usa antes el canal WebSocket
+        (ver _converse_over_channel) y on_partial recibe el texto parcial.
         """
         # Asegurar autenticación válida
-        if not await self._ensure_authenticated():
+        if not (self._token_usable() or await self._ensure_authenticated()):
             return {
                 "success": False,
                 "error": "Failed to authenticate with remote backend"
             }
         
         lang = (language or self.default_language or "es").strip() or "es"
-        meta_str = metadata_json if isinstance(metadata_json, str) else (json.dumps(metadata_json) if metadata_json else "{}")
-        url = f"{self.base_url}{self.conversation_path}"
+        meta_str = metadata_json if isinstance(metadata_json, str) else (orjson.dumps(metadata_json).decode() if metadata_json else "{}")
+        url = self._conversation_url
         
-        for attempt in range(self.retry_attempts):
-            try:
-                self.logger.info(f"🗣️ Sending audio to conversation endpoint (attempt {attempt + 1})...")
-                self.logger.info(f"🔗 URL: {url}")
-                self.logger.info(f"👤 Session: {session_id}, User: {user_id}, Language: {lang}")
-                
-                # Preparar headers de autenticación
-                headers = {
-                    "Authorization": f"Bearer {self.access_token}"
-                }
-                
-                # Preparar archivo de audio
-                files = {
-                    "audio": ("audio.wav", audio_data, "audio/wav")
-                }
-                
-                # Preparar datos del formulario
-                form_data = {
-                    "sessionId": session_id,
-                    "userId": user_id,
-                    "language": lang,
-                    "generateAudioResponse": str(generate_audio_response).lower(),
-                    "metadata": meta_str
-                }
-                
-                # Enviar petición
-                response = await self.session.post(
-                    url,
-                    files=files,
-                    data=form_data,
-                    headers=headers
-                )
-                
-                # Manejar token expirado
-                if response.status_code == 401:
-                    self.logger.warning(f"🔒 Token expired (attempt {attempt + 1}), refreshing...")
-                    if await self._refresh_auth_token():
-                        continue
-                    else:
-                        return {"success": False, "error": "Authentication expired and refresh failed"}
-                
-                # Respuesta exitosa
-                if response.status_code == 200:
-                    result = response.json()
-                    self.logger.info(f"✅ Conversation response received")
-                    if result.get("text"):
-                        self.logger.info(f"Text: {result['text'][:100]}...")
-                    if result.get("audioResponse"):
-                        self.logger.info(f"Audio response included (base64 length: {len(str(result['audioResponse']))})")
+        fields = {
+            "sessionId": session_id,
+            "userId": user_id,
+            "language": lang,
+            "generateAudioResponse": str(generate_audio_response).lower(),
+            "metadata": meta_str
+        }
+        
+        async with self._send_sem:
+            if self.ws_url:
+                result = await self._converse_over_channel(fields, audio_data, on_partial)
+                if result is not None:
+                    return result
+            
+            # Cuerpo multipart armado una sola vez para todos los intentos
+            body_parts, body_headers = _build_multipart_body(fields, audio_data)
+            digest, cached = self._prepare_dedup(audio_data, fields, body_headers)
+            body = _PrebuiltBody(body_parts)
+            auth = _BearerTokenAuth(self)
+            
+            for attempt in range(self.retry_attempts):
+                try:
+                    self.logger.info(f"🗣️ Sending audio to conversation endpoint (attempt {attempt + 1})...")
+                    self.logger.info(f"🔗 URL: {url}")
+                    self.logger.info(f"👤 Session: {session_id}, User: {user_id}, Language: {lang}")
                     
-                    return {"success": True, **result}
-                else:
-                    error_detail = "Unknown error"
-                    try:
-                        error_data = response.json()
-                        error_detail = error_data.get("detail", error_data.get("message", str(error_data)))
-                    except:
-                        error_detail = response.text
+                    # Enviar petición (auth gestiona token y 401)
+                    response = await self.session.post(
+                        url,
+                        content=body,
+                        headers=body_headers,
+                        auth=auth
+                    )
                     
-                    self.logger.error(f"❌ Conversation endpoint error ({response.status_code}): {error_detail}")
+                    # 401 con el presupuesto de renovación agotado
+                    if response.status_code == 401:
+                        return {"success": False, "error": "Authentication expired and refresh failed"}
                     
-                    if 400 <= response.status_code < 500:
-                        return {"success": False, "error": f"Backend error {response.status_code}: {error_detail}"}
+                    # Mismo envío ya procesado: el remoto no repite el trabajo
+                    if response.status_code == 304 and cached is not None:
+                        self.logger.info("♻️ Conversation endpoint reports duplicate audio, reusing previous result")
+                        return cached
                     
+                    # Respuesta exitosa
+                    if response.status_code == 200:
+                        result = await _decode_json_body(response.content)
+                        self.logger.info(f"✅ Conversation response received")
+                        if result.get("text"):
+                            self.logger.info(f"Text: {result['text'][:100]}...")
+                        if result.get("audioResponse"):
+                            self.logger.info(f"Audio response included (base64 length: {len(str(result['audioResponse']))})")
+                        
+                        return self._remember_result(digest, {"success": True, **result})
+                    else:
+                        error_detail = "Unknown error"
+                        try:
+                            error_data = response.json()
+                            error_detail = error_data.get("detail", error_data.get("message", str(error_data)))
+                        except:
+                            error_detail = response.text
+                        
+                        self.logger.error(f"❌ Conversation endpoint error ({response.status_code}): {error_detail}")
+                        
+                        if 400 <= response.status_code < 500:
+                            return {"success": False, "error": f"Backend error {response.status_code}: {error_detail}"}
+                        
+                        if attempt < self.retry_attempts - 1:
+                            await asyncio.sleep(self._backoff(attempt))
+                            continue
+                        
+                        return {"success": False, "error": f"Backend error after {self.retry_attempts} attempts: {error_detail}"}
+                        
+                except httpx.TimeoutException:
+                    self.logger.error(f"❌ Timeout in conversation endpoint (attempt {attempt + 1})")
                     if attempt < self.retry_attempts - 1:
-                        await asyncio.sleep(self.retry_delay * (attempt + 1))
+                        await asyncio.sleep(self._backoff(attempt))
                         continue
+                    return {"success": False, "error": "Timeout communicating with remote backend"}
                     
-                    return {"success": False, "error": f"Backend error after {self.retry_attempts} attempts: {error_detail}"}
+                except httpx.ConnectError:
+                    self.logger.error(f"❌ Connection error to conversation endpoint (attempt {attempt + 1})")
+                    if attempt < self.retry_attempts - 1:
+                        await asyncio.sleep(self._backoff(attempt))
+                        continue
+                    return {"success": False, "error": "Cannot connect to remote backend"}
                     
-            except httpx.TimeoutException:
-                self.logger.error(f"❌ Timeout in conversation endpoint (attempt {attempt + 1})")
-                if attempt < self.retry_attempts - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                return {"success": False, "error": "Timeout communicating with remote backend"}
-                
-            except httpx.ConnectError:
-                self.logger.error(f"❌ Connection error to conversation endpoint (attempt {attempt + 1})")
-                if attempt < self.retry_attempts - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                return {"success": False, "error": "Cannot connect to remote backend"}
-                
-            except Exception as e:
-                self.logger.error(f"❌ Unexpected error in conversation (attempt {attempt + 1}): {e}")
-                if attempt < self.retry_attempts - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                return {"success": False, "error": f"Unexpected error: {str(e)}"}
-        
-        return {"success": False, "error": f"Failed after {self.retry_attempts} attempts"}
+                except Exception as e:
+                    self.logger.error(f"❌ Unexpected error in conversation (attempt {attempt + 1}): {e}")
+                    if attempt < self.retry_attempts - 1:
+                        await asyncio.sleep(self._backoff(attempt))
+                        continue
+                    return {"success": False, "error": f"Unexpected error: {str(e)}"}
+            
+            return {"success": False, "error": f"Failed after {self.retry_attempts} attempts"}
         
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -548,33 +990,34 @@ class RemoteBackendClient:
         
         Returns:
             Dict con información de estado
+            
+        Solo los errores de red/HTTP se traducen a "unreachable"; cualquier
+        otra excepción es un bug y se propaga al llamador.
         """
         try:
             response = await self.session.get(
-                f"{self.base_url}/health",
+                self._health_url,
                 timeout=10.0
             )
-            
-            if response.status_code == 200:
-                return {
-                    "status": "healthy",
-                    "response_time_ms": response.elapsed.total_seconds() * 1000,
-                    "authenticated": self.is_authenticated,
-                    "token_expires_at": self.token_expires_at.isoformat() if self.token_expires_at else None
-                }
-            else:
-                return {
-                    "status": "unhealthy",
-                    "error": f"HTTP {response.status_code}",
-                    "authenticated": self.is_authenticated
-                }
-                
-        except Exception as e:
+        except httpx.HTTPError as e:
             return {
                 "status": "unreachable",
-                "error": str(e),
+                "error": str(e) or type(e).__name__,
                 "authenticated": False
             }
+        
+        if response.status_code == 200:
+            return {
+                "status": "healthy",
+                "response_time_ms": response.elapsed.total_seconds() * 1000,
+                "authenticated": self.is_authenticated,
+                "token_expires_at": self.token_expires_at_iso
+            }
+        return {
+            "status": "unhealthy",
+            "error": f"HTTP {response.status_code}",
+            "authenticated": self.is_authenticated
+        }
 
 
 # Instancia singleton global
@@ -8,12 +8,17 @@ Replica y sincroniza el estado del hardware, agregando estados del backend y rem
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 
 from clients.hardware_client import get_hardware_client, HardwareClient
 
+# Ventana (segundos) en la que se agrupan los cambios antes de notificar al
+# frontend: transiciones encadenadas generan un único unified_state_update
+NOTIFY_DEBOUNCE = 0.02
+
 
 class BackendState(Enum):
     """Estados del backend local"""
@@ -27,6 +32,19 @@ class BackendState(Enum):
     ERROR = "error"
 
 
+# Estados del backend en los que el hardware no está conectado
+_HW_DISCONNECTED_STATES = frozenset({
+    BackendState.CONNECTING_HARDWARE,
+    BackendState.HARDWARE_DISCONNECTED
+})
+
+# Estado de un servicio sin datos (compartido: no modificar)
+_UNKNOWN_SERVICE_STATE = {
+    "state": "unknown",
+    "available": False
+}
+
+
 class StateManagerGateway:
     """
     StateManager que actúa como gateway entre hardware, frontend y backend remoto.
@@ -46,6 +64,10 @@ class StateManagerGateway:
         self.backend_state: BackendState = BackendState.STARTING
         self.remote_state: Optional[Dict[str, Any]] = None
         
+        # Campos relevantes del último estado de hardware, para detectar cambios
+        # con una sola comparación de tuplas
+        self._hardware_signature: Tuple = ()
+        
         # Timestamps
         self.last_hardware_sync: Optional[float] = None
         self.last_hardware_update: Optional[float] = None
@@ -53,13 +75,39 @@ class StateManagerGateway:
         # WebSocket manager para notificar frontend
         self.websocket_manager = websocket_manager
         
+        # Cliente hardware, resuelto una sola vez en start()
+        self.hardware_client: Optional[HardwareClient] = None
+        
         # Configuration
-        self.hardware_sync_interval: float = 1.0  # Sync cada 1 segundo (reducido para mejor responsividad)
+        # Sync adaptativo: intervalo mínimo tras actividad que crece ×1.5
+        # hasta el máximo en reposo
+        self.hardware_sync_interval_min: float = 0.5
+        self.hardware_sync_interval_max: float = 5.0
+        self.hardware_sync_interval: float = self.hardware_sync_interval_min
         self.hardware_timeout: float = 30.0       # Timeout de hardware
         
-        # Tasks
+        # Tasks. El sync con hardware es una tarea por ciclo; el siguiente se
+        # programa con call_later y los eventos del hardware lo adelantan
         self._sync_task: Optional[asyncio.Task] = None
+        self._sync_handle: Optional[asyncio.TimerHandle] = None
+        self._sync_pending = False
+        self._notify_task: Optional[asyncio.Task] = None
         self._running = False
+        
+        # Estado pendiente de notificar al frontend (lo consume _notify_loop)
+        self._dirty = asyncio.Event()
+        # Último estado unificado enviado; al estar memoizado, el mismo objeto
+        # significa que no hay nada nuevo que contar al frontend
+        self._last_notified_state: Optional[Dict[str, Any]] = None
+        
+        # Último estado unificado y las entradas con las que se construyó
+        self._unified_state: Optional[Dict[str, Any]] = None
+        self._unified_key: Optional[tuple] = None
+    
+    @property
+    def hardware_connected(self) -> bool:
+        """Indica si el backend tiene conexión con el hardware"""
+        return self.backend_state not in _HW_DISCONNECTED_STATES
     
     def set_websocket_manager(self, manager):
         """Inyectar websocket manager"""
@@ -71,12 +119,15 @@ class StateManagerGateway:
         
         self._running = True
         self.backend_state = BackendState.CONNECTING_HARDWARE
+        self.hardware_client = get_hardware_client()
         
         # Notificar frontend del estado inicial
-        await self._notify_frontend()
+        self._notify_task = asyncio.create_task(self._notify_loop())
+        self._notify_frontend()
         
-        # Iniciar tarea de sincronización con hardware
-        self._sync_task = asyncio.create_task(self._hardware_sync_loop())
+        # Iniciar sincronización con hardware
+        self.logger.info("🔄 Starting hardware sync...")
+        self._schedule_sync()
         
         self.logger.info("✅ StateManager Gateway started")
     
@@ -86,12 +137,16 @@ class StateManagerGateway:
         
         self._running = False
         
-        if self._sync_task:
-            self._sync_task.cancel()
-            try:
-                await self._sync_task
-            except asyncio.CancelledError:
-                pass
+        if self._sync_handle:
+            self._sync_handle.cancel()
+        
+        for task in (self._sync_task, self._notify_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         
         self.logger.info("✅ StateManager Gateway stopped")
     
@@ -99,26 +154,53 @@ class StateManagerGateway:
     # SINCRONIZACIÓN CON HARDWARE
     # ===============================================
     
-    async def _hardware_sync_loop(self):
-        """Loop principal de sincronización con hardware"""
-        self.logger.info("🔄 Starting hardware sync loop...")
+    def _schedule_sync(self):
+        """Lanzar un ciclo de sincronización con hardware"""
+        self._sync_handle = None
+        if self._running:
+            self._sync_task = asyncio.create_task(self._run_sync())
+    
+    async def _run_sync(self):
+        """Un ciclo de sync; al terminar programa el siguiente según el intervalo actual"""
+        try:
+            await self._sync_hardware_state()
+        except Exception as e:
+            self.logger.error("❌ Error in hardware sync: %s", e)
+        finally:
+            if self._running:
+                # Si llegó un evento durante el ciclo, su resultado puede ser
+                # anterior al evento: repetir enseguida (/state no se cachea
+                # en HardwareClient, así que la repetición lee del hardware)
+                delay = 0 if self._sync_pending else self.hardware_sync_interval
+                self._sync_pending = False
+                self._sync_handle = asyncio.get_running_loop().call_later(delay, self._schedule_sync)
+    
+    def _wake_hardware_sync(self):
+        """
+        Hay actividad: volver al intervalo mínimo y sincronizar ya.
         
-        while self._running:
-            try:
-                await self._sync_hardware_state()
-                await asyncio.sleep(self.hardware_sync_interval)
-                
-            except asyncio.CancelledError:
-                self.logger.info("🔄 Hardware sync loop cancelled")
-                break
-            except Exception as e:
-                self.logger.error(f"❌ Error in hardware sync loop: {e}")
-                await asyncio.sleep(self.hardware_sync_interval)
+        El sync lee /state directamente del hardware (sin caché), así que
+        ve el cambio que ha provocado el evento.
+        """
+        self.hardware_sync_interval = self.hardware_sync_interval_min
+        
+        if self._sync_task and not self._sync_task.done():
+            self._sync_pending = True
+        elif self._sync_handle:
+            self._sync_handle.cancel()
+            self._schedule_sync()
+    
+    def _slow_down_hardware_sync(self):
+        """Sin cambios: alargar el intervalo de sync hasta el máximo"""
+        self.hardware_sync_interval = min(
+            self.hardware_sync_interval_max,
+            self.hardware_sync_interval * 1.5
+        )
     
     async def _sync_hardware_state(self):
         """Sincronizar estado con el hardware"""
         try:
-            hardware_client = get_hardware_client()
+            hardware_client = self.hardware_client
             
             # Obtener estado del hardware
             hardware_state = await hardware_client.get_state()
@@ -128,49 +210,58 @@ class StateManagerGateway:
                 old_state = self.hardware_state.get("state") if self.hardware_state else "unknown"
                 new_state = hardware_state.get("state", "unknown")
                 
-                self.logger.info(f"🔄 Hardware state change: {old_state} -> {new_state}")
+                self.logger.info("🔄 Hardware state change: %s -> %s", old_state, new_state)
                 
                 # Actualizar estado
                 self.hardware_state = hardware_state
-                self.last_hardware_update = datetime.now().timestamp()
-                
-                # Notificar cambio al frontend
-                await self._notify_frontend()
+                self.last_hardware_update = time.time()
+                changed = True
+            else:
+                changed = False
             
             # Actualizar timestamp de sincronización
-            self.last_hardware_sync = datetime.now().timestamp()
+            self.last_hardware_sync = time.time()
             
             # Actualizar estado del backend
             if self.backend_state == BackendState.CONNECTING_HARDWARE:
                 self.backend_state = BackendState.HARDWARE_CONNECTED
-                await self._notify_frontend()
+                changed = True
             elif self.backend_state == BackendState.HARDWARE_DISCONNECTED:
                 self.backend_state = BackendState.HARDWARE_CONNECTED
                 self.logger.info("✅ Hardware reconnected!")
-                await self._notify_frontend()
+                changed = True
+            
+            # Intervalo del próximo sync según la actividad observada; los
+            # cambios de hardware y de backend_state se notifican juntos
+            if changed:
+                self._notify_frontend()
+                self.hardware_sync_interval = self.hardware_sync_interval_min
+            else:
+                self._slow_down_hardware_sync()
                 
         except Exception as e:
-            self.logger.warning(f"⚠️ Failed to sync with hardware: {e}")
+            self.logger.warning("⚠️ Failed to sync with hardware: %s", e)
+            self._slow_down_hardware_sync()
             
             # Marcar hardware como desconectado
             if self.backend_state != BackendState.HARDWARE_DISCONNECTED:
                 self.backend_state = BackendState.HARDWARE_DISCONNECTED
                 self.logger.warning("❌ Hardware disconnected")
-                await self._notify_frontend()
+                self._notify_frontend()
     
     def _has_hardware_state_changed(self, new_state: Dict[str, Any]) -> bool:
-        """Verificar si el estado del hardware ha cambiado"""
-        if self.hardware_state is None:
-            return True
+        """
+        Verificar si el estado del hardware ha cambiado.
         
-        # Comparar campos importantes
-        important_fields = ["state", "listening_duration_seconds"]
+        Compara los campos importantes (state, listening_duration_seconds)
+        con la firma guardada del último estado y la actualiza si cambian.
+        """
+        signature = (new_state.get("state"), new_state.get("listening_duration_seconds"))
+        if signature == self._hardware_signature:
+            return False
         
-        for field in important_fields:
-            if self.hardware_state.get(field) != new_state.get(field):
-                return True
-        
-        return False
+        self._hardware_signature = signature
+        return True
     
     # ===============================================
     # GESTIÓN DE ESTADOS
@@ -182,47 +273,58 @@ class StateManagerGateway:
             old_state = self.backend_state.value
             self.backend_state = new_state
             
-            self.logger.info(f"🔄 Backend state change: {old_state} -> {new_state.value}")
-            await self._notify_frontend()
+            self.logger.info("🔄 Backend state change: %s -> %s", old_state, new_state.value)
+            self._notify_frontend()
     
     def get_unified_state(self) -> Dict[str, Any]:
-        """Obtener estado unificado del sistema completo"""
-        now = datetime.now().timestamp()
+        """
+        Obtener estado unificado del sistema completo.
+        
+        Se reconstruye solo cuando cambia alguna de sus entradas: los estados
+        de hardware/remoto se sustituyen enteros (nunca se mutan), así que
+        basta compararlos por identidad. El resultado es compartido y no
+        debe modificarse; timestamp y seconds_since_update corresponden al
+        momento de construcción (como mucho un ciclo de sync de antigüedad).
+        """
+        key = (self.hardware_state, self.remote_state, self.backend_state, self.last_hardware_sync)
+        cached_key = self._unified_key
+        if cached_key is not None and all(a is b for a, b in zip(key, cached_key)):
+            return self._unified_state
+        
+        self._unified_state = self._build_unified_state()
+        self._unified_key = key
+        return self._unified_state
+    
+    def _build_unified_state(self) -> Dict[str, Any]:
+        """Construir el estado unificado a partir de los estados actuales"""
+        # Una sola lectura del reloj para timestamp y seconds_since_update
+        now = time.time()
         
         # Estado base
         unified_state = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
             "backend": {
                 "state": self.backend_state.value,
                 "last_hardware_sync": self.last_hardware_sync,
-                "hardware_connected": self.backend_state not in [
-                    BackendState.CONNECTING_HARDWARE,
-                    BackendState.HARDWARE_DISCONNECTED
-                ]
+                "hardware_connected": self.hardware_connected
             }
         }
         
-        # Agregar estado del hardware si está disponible
+        # Los estados de hardware/remoto se sustituyen enteros y nunca se
+        # mutan: se comparten por referencia en lugar de copiarlos
         if self.hardware_state:
-            unified_state["hardware"] = self.hardware_state.copy()
-            
-            # Calcular tiempo desde última actualización
             if self.last_hardware_update:
-                unified_state["hardware"]["seconds_since_update"] = now - self.last_hardware_update
+                # Calcular tiempo desde última actualización (sin tocar el original)
+                unified_state["hardware"] = {
+                    **self.hardware_state,
+                    "seconds_since_update": now - self.last_hardware_update
+                }
+            else:
+                unified_state["hardware"] = self.hardware_state
         else:
-            unified_state["hardware"] = {
-                "state": "unknown",
-                "available": False
-            }
+            unified_state["hardware"] = _UNKNOWN_SERVICE_STATE
         
-        # Agregar estado remoto si está disponible
-        if self.remote_state:
-            unified_state["remote"] = self.remote_state.copy()
-        else:
-            unified_state["remote"] = {
-                "state": "unknown",
-                "available": False
-            }
+        unified_state["remote"] = self.remote_state or _UNKNOWN_SERVICE_STATE
         
         return unified_state
     
@@ -230,7 +332,7 @@ class StateManagerGateway:
         """Procesar eventos del hardware (audio capturado, botón, etc.)"""
         event_type = event.get("type", "unknown")
         
-        self.logger.info(f"📡 Hardware event received: {event_type}")
+        self.logger.info("📡 Hardware event received: %s", event_type)
         
         if event_type == "audio_captured":
             await self._handle_audio_captured_event(event)
@@ -239,10 +341,13 @@ class StateManagerGateway:
         elif event_type == "state_change":
             await self._handle_state_change_event(event)
         else:
-            self.logger.warning(f"Unknown hardware event type: {event_type}")
+            self.logger.warning("Unknown hardware event type: %s", event_type)
+        
+        # Un evento anticipa cambios de estado: sondear rápido de nuevo
+        self._wake_hardware_sync()
         
         # Siempre notificar al frontend sobre eventos
-        await self._notify_frontend()
+        self._notify_frontend()
     
     async def _handle_audio_captured_event(self, event: Dict[str, Any]):
         """Manejar evento de audio capturado"""
@@ -261,31 +366,43 @@ class StateManagerGateway:
     async def _handle_button_press_event(self, event: Dict[str, Any]):
         """Manejar evento de botón presionado"""
         button_type = event.get("button_type", "unknown")
-        self.logger.info(f"🔘 Button press: {button_type}")
+        self.logger.info("🔘 Button press: %s", button_type)
         
         # Los eventos de botón se propagan al frontend sin cambiar estado
     
     async def _handle_state_change_event(self, event: Dict[str, Any]):
         """Manejar evento de cambio de estado del hardware"""
         new_hardware_state = event.get("state", "unknown")
-        self.logger.info(f"🔄 Hardware state change event: {new_hardware_state}")
+        self.logger.info("🔄 Hardware state change event: %s", new_hardware_state)
         
-        # Forzar sincronización inmediata
-        await self._sync_hardware_state()
+        # La sincronización inmediata la lanza handle_hardware_event
     
     # ===============================================
     # COMUNICACIÓN CON FRONTEND
     # ===============================================
     
-    async def _notify_frontend(self):
-        """Notificar cambios al frontend via WebSocket"""
+    def _notify_frontend(self):
+        """Marcar el estado como pendiente de notificar al frontend"""
         if self.websocket_manager:
-            unified_state = self.get_unified_state()
+            self._dirty.set()
+    
+    async def _notify_loop(self):
+        """Enviar al frontend como mucho un estado unificado por ventana de debounce"""
+        while self._running:
+            await self._dirty.wait()
+            
+            # Dejar que lleguen los cambios encadenados y leer el estado final
+            await asyncio.sleep(NOTIFY_DEBOUNCE)
+            self._dirty.clear()
             
-            await self.websocket_manager.broadcast({
-                "type": "unified_state_update",
-                "payload": unified_state
-            })
+            try:
+                state = self.get_unified_state()
+                if state is self._last_notified_state:
+                    continue
+                self._last_notified_state = state
+                await self.websocket_manager.broadcast_unified_state(state)
+            except Exception as e:
+                self.logger.error("❌ Error notifying frontend: %s", e)
     
     # ===============================================
     # MÉTODOS PARA API ENDPOINTS
@@ -294,7 +411,7 @@ class StateManagerGateway:
     async def send_command_to_hardware(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Enviar comando al hardware"""
         try:
-            hardware_client = get_hardware_client()
+            hardware_client = self.hardware_client
             command_type = command.get("type")
             
             if command_type == "led_pattern":
@@ -316,40 +433,11 @@ class StateManagerGateway:
     async def get_hardware_metrics(self) -> Dict[str, Any]:
         """Obtener métricas del hardware"""
         try:
-            hardware_client = get_hardware_client()
+            hardware_client = self.hardware_client
             return await hardware_client.get_metrics()
         except Exception as e:
             self.logger.warning(f"Could not get hardware metrics: {e}")
             return {"error": str(e), "available": False}
-    
-    # ===============================================
-    # COMPATIBILIDAD CON CÓDIGO ANTERIOR
-    # ===============================================
-    
-    def get_assistant_status(self) -> str:
-        """Compatibilidad: obtener estado del asistente"""
-        if self.hardware_state:
-            return self.hardware_state.get("state", "unknown")
-        return "unknown"
-    
-    def get_hardware_status(self) -> Dict[str, Any]:
-        """Compatibilidad: obtener estado del hardware"""
-        return self.hardware_state or {}
-    
-    async def set_assistant_status(self, status: str):
-        """Compatibilidad: establecer estado del asistente"""
-        try:
-            hardware_client = get_hardware_client()
-            await hardware_client.set_state(status)
-            self.logger.info(f"✅ Assistant status changed to: {status}")
-        except Exception as e:
-            self.logger.error(f"❌ Failed to set assistant status: {e}")
-    
-    async def set_hardware_status(self, status: Dict[str, Any]):
-        """Compatibilidad: establecer estado del hardware (NO-OP)"""
-        # En la nueva arquitectura, el hardware mantiene su propio estado
-        # Este método existe solo para compatibilidad
-        self.logger.warning("set_hardware_status called - hardware manages its own state")
 
 
 # Instancia singleton
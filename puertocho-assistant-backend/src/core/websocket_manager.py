@@ -6,11 +6,75 @@ Maneja conexiones WebSocket con el frontend, distribuyendo eventos
 en tiempo real desde hardware, backend y servicios remotos.
 """
 
+import asyncio
 import time
 import logging
-import uuid
-from typing import List, Dict, Any
+import secrets
+import weakref
+import msgpack
+import orjson
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple, Union
 from fastapi import WebSocket
+from starlette.websockets import WebSocketDisconnect, WebSocketState
+from websockets.exceptions import ConnectionClosed
+
+# Tiempo máximo (segundos) de un envío a un cliente; si se supera, el
+# cliente se considera atascado y se desconecta
+SEND_TIMEOUT = 5.0
+# Tiempo máximo (segundos) para cerrar el socket de un cliente retirado
+CLOSE_TIMEOUT = 5.0
+# Subprotocolo para recibir frames binarios MessagePack en lugar de JSON
+MSGPACK_SUBPROTOCOL = "msgpack.v1"
+# Frames pendientes por cliente y carril; al llenarse se descarta el más antiguo
+CLIENT_QUEUE_SIZE = 32
+# Frames de baja prioridad que caben en cada envío, para que una ráfaga de
+# métricas no retrase el siguiente estado
+LOW_PRIORITY_BATCH = 8
+
+# Errores de envío que indican conexión cerrada o atascada; RuntimeError es
+# el de Starlette al enviar tras el mensaje de cierre
+_DISCONNECT_ERRORS = (WebSocketDisconnect, ConnectionClosed, RuntimeError, asyncio.TimeoutError)
+
+# Mensajes críticos para la UI: adelantan a métricas, logs y audio
+_HIGH_PRIORITY_TYPES = frozenset({
+    "unified_state_update",
+    "initial_state",
+    "current_state",
+    "hardware_event",
+    "error",
+    "connection_info",
+    "pong"
+})
+
+
+def _now_ms() -> int:
+    """Timestamp en milisegundos en aritmética entera (sin pasar por float)"""
+    return time.time_ns() // 1_000_000
+
+
+def _batch_frame(frames: List[str]) -> str:
+    """Envolver frames ya serializados en un único frame batch"""
+    return (
+        '{"type":"batch","payload":[' + ",".join(frames) +
+        '],"timestamp":' + str(_now_ms()) + "}"
+    )
+
+
+def _batch_packed(frames: List[bytes]) -> bytes:
+    """Versión MessagePack de _batch_frame, sin volver a serializar los frames"""
+    packer = msgpack.Packer()
+    return b"".join((
+        packer.pack_map_header(3),
+        packer.pack("type"), packer.pack("batch"),
+        packer.pack("payload"), packer.pack_array_header(len(frames)), *frames,
+        packer.pack("timestamp"), packer.pack(_now_ms())
+    ))
+
+
+def _pack(message: Dict[str, Any]) -> bytes:
+    """Serializar un mensaje a MessagePack"""
+    return msgpack.packb(message, default=str)
 
 
 class WebSocketManager:
@@ -22,11 +86,45 @@ class WebSocketManager:
     - Distribuir eventos en tiempo real (hardware, backend, remoto)
     - Manejar comandos del frontend hacia hardware
     - Logging de conexiones y eventos
+    
+    Cada conexión tiene dos colas acotadas (alta y baja prioridad) y su
+    tarea de envío: broadcast solo serializa una vez y encola, sin esperar
+    a la red. La tarea de envío agrupa en un solo frame
+    {"type": "batch", "payload": [...]} todo lo pendiente de alta
+    prioridad y unos pocos de baja; un cliente lento pierde los mensajes
+    más antiguos y recibe siempre los últimos.
+    
+    Los clientes que negocian el subprotocolo msgpack.v1 reciben frames
+    binarios MessagePack; el resto sigue recibiendo JSON de texto.
     """
     
     def __init__(self):
-        self.active_connections: List[Dict[str, Any]] = []
+        # Conexiones por id, más el índice inverso websocket → id para que
+        # desconectar y retirar conexiones caídas sea O(1)
+        self.active_connections: Dict[str, Dict[str, Any]] = {}
+        self._ws_to_id: "weakref.WeakKeyDictionary[WebSocket, str]" = weakref.WeakKeyDictionary()
         self.logger = logging.getLogger("websocket_manager")
+        # Sobre reutilizado para el mensaje más frecuente: broadcast lo
+        # serializa sin ceder el bucle, así que basta con cambiar sus campos
+        self._unified_envelope: Dict[str, Any] = {
+            "type": "unified_state_update",
+            "payload": None,
+            "timestamp": 0
+        }
+        # Último frame de estado enviado por (tipo, binario): el estado
+        # unificado está memoizado, así que mientras sea el mismo objeto los
+        # clientes que lo piden reciben el frame ya serializado
+        self._state_frames: Dict[Tuple[str, bool], Tuple[Dict[str, Any], Union[str, bytes]]] = {}
+    
+    async def stop(self):
+        """Detener las tareas de envío de todas las conexiones"""
+        tasks = [conn["sender"] for conn in self.active_connections.values()]
+        self.active_connections.clear()
+        self._ws_to_id.clear()
+        
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     
     async def connect(self, websocket: WebSocket) -> str:
         """
@@ -35,17 +133,25 @@ class WebSocketManager:
         Returns:
             connection_id: ID único de la conexión
         """
-        await websocket.accept()
+        binary = MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", ())
+        await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL if binary else None)
         
-        connection_id = str(uuid.uuid4())[:8]
+        connection_id = secrets.token_hex(4)
         connection_info = {
             "id": connection_id,
             "websocket": websocket,
             "connected_at": time.time(),
-            "client_ip": websocket.client.host if websocket.client else "unknown"
+            "client_ip": websocket.client.host if websocket.client else "unknown",
+            "high": deque(maxlen=CLIENT_QUEUE_SIZE),
+            "low": deque(maxlen=CLIENT_QUEUE_SIZE),
+            "wakeup": asyncio.Event(),
+            "binary": binary,
+            "dropped": 0
         }
+        connection_info["sender"] = asyncio.create_task(self._client_sender(connection_info))
         
-        self.active_connections.append(connection_info)
+        self.active_connections[connection_id] = connection_info
+        self._ws_to_id[websocket] = connection_id
         
         self.logger.info(
             f"🌐 WebSocket client connected: {connection_id} from {connection_info['client_ip']} "
@@ -56,22 +162,30 @@ class WebSocketManager:
     
     def disconnect(self, websocket: WebSocket):
         """Desconectar cliente WebSocket"""
-        # Buscar y remover la conexión
-        for i, conn in enumerate(self.active_connections):
-            if conn["websocket"] == websocket:
-                connection_id = conn["id"]
-                client_ip = conn["client_ip"]
-                self.active_connections.pop(i)
-                
-                self.logger.info(
-                    f"🌐 WebSocket client disconnected: {connection_id} from {client_ip} "
-                    f"(remaining: {len(self.active_connections)})"
-                )
-                break
+        connection_id = self._ws_to_id.get(websocket)
+        conn = self._remove_connection(connection_id)
+        if conn is None:
+            return
+        
+        self.logger.info(
+            f"🌐 WebSocket client disconnected: {connection_id} from {conn['client_ip']} "
+            f"(remaining: {len(self.active_connections)})"
+        )
+    
+    def _remove_connection(self, connection_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Retirar una conexión y parar su tarea de envío"""
+        conn = self.active_connections.pop(connection_id, None)
+        if conn is None:
+            return None
+        
+        self._ws_to_id.pop(conn["websocket"], None)
+        if conn["sender"] is not asyncio.current_task():
+            conn["sender"].cancel()
+        return conn
     
     async def broadcast(self, message: Dict[str, Any]):
         """
-        Enviar mensaje a todos los clientes conectados.
+        Encolar un mensaje para todos los clientes conectados.
         
         Args:
             message: Mensaje a enviar (debe ser serializable a JSON)
@@ -81,45 +195,165 @@ class WebSocketManager:
         
         # Agregar timestamp si no existe
         if "timestamp" not in message:
-            message["timestamp"] = int(time.time() * 1000)
+            message["timestamp"] = _now_ms()
         
-        message_type = message.get("type", "unknown")
-        self.logger.debug(f"📡 Broadcasting to {len(self.active_connections)} clients: {message_type}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "📡 Broadcasting to %d clients: %s",
+                len(self.active_connections), message.get("type", "unknown")
+            )
         
-        # Lista de conexiones a remover (desconectadas)
-        disconnected_connections = []
+        # Serializar una sola vez por formato para todas las conexiones
+        # (texto JSON por defecto, para que el frontend siga usando JSON.parse)
+        data = orjson.dumps(message).decode()
+        packed = None
+        lane = "high" if message.get("type") in _HIGH_PRIORITY_TYPES else "low"
+        
+        for conn in self.active_connections.values():
+            if conn["binary"]:
+                if packed is None:
+                    packed = _pack(message)
+                self._enqueue(conn, packed, lane)
+            else:
+                self._enqueue(conn, data, lane)
+    
+    @staticmethod
+    def _enqueue(conn: Dict[str, Any], data: Union[str, bytes], lane: str):
+        """Encolar un frame serializado en un carril de envío de una conexión"""
+        queue = conn[lane]
+        if len(queue) == queue.maxlen:
+            # Cliente lento: el deque descarta lo más antiguo al añadir
+            conn["dropped"] += 1
+        queue.append(data)
+        conn["wakeup"].set()
+    
+    async def _client_sender(self, conn: Dict[str, Any]):
+        """Tarea de envío de una conexión: alta prioridad primero, baja con cupo"""
+        high = conn["high"]
+        low = conn["low"]
+        wakeup = conn["wakeup"]
+        websocket = conn["websocket"]
+        if conn["binary"]:
+            send, batch = websocket.send_bytes, _batch_packed
+        else:
+            send, batch = websocket.send_text, _batch_frame
         
-        for conn in self.active_connections:
+        while True:
+            if not high and not low:
+                wakeup.clear()
+                await wakeup.wait()
+            
+            frames = list(high)
+            high.clear()
+            for _ in range(min(len(low), LOW_PRIORITY_BATCH)):
+                frames.append(low.popleft())
+            
+            data = frames[0] if len(frames) == 1 else batch(frames)
+            
+            if (websocket.client_state is not WebSocketState.CONNECTED or
+                    websocket.application_state is not WebSocketState.CONNECTED):
+                await self._drop_client(conn)
+                return
+            
             try:
-                await conn["websocket"].send_json(message)
+                await asyncio.wait_for(send(data), timeout=SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Cliente atascado pero abierto
+                self.logger.warning("❌ Send to %s timed out after %.1fs", conn["id"], SEND_TIMEOUT)
+                await self._drop_client(conn)
+                return
+            except _DISCONNECT_ERRORS as e:
+                # Conexión caída o cerrándose
+                self.logger.warning("❌ Failed to send to %s: %r", conn["id"], e)
+                await self._drop_client(conn)
+                return
             except Exception as e:
-                self.logger.warning(f"❌ Failed to send to {conn['id']}: {e}")
-                disconnected_connections.append(conn)
+                # Fallo puntual: se pierde el frame pero el cliente sigue
+                self.logger.error("❌ Unexpected error sending to %s: %r", conn["id"], e)
+    
+    async def _drop_client(self, conn: Dict[str, Any]):
+        """
+        Retirar desde su tarea de envío una conexión que ya no acepta frames.
+        
+        Además de olvidar la conexión se cierra el socket (1011, acotado por
+        CLOSE_TIMEOUT): así el bucle de /ws termina y el frontend reconecta
+        en lugar de quedarse conectado sin recibir nada.
+        """
+        if self._remove_connection(conn["id"]) is not None:
+            self.logger.info("🗑️ Removed disconnected client: %s", conn["id"])
         
-        # Remover conexiones desconectadas
-        for conn in disconnected_connections:
-            self.active_connections.remove(conn)
-            self.logger.info(f"🗑️ Removed disconnected client: {conn['id']}")
+        websocket = conn["websocket"]
+        if websocket.application_state is WebSocketState.DISCONNECTED:
+            return
+        try:
+            await asyncio.wait_for(websocket.close(code=1011), timeout=CLOSE_TIMEOUT)
+        except Exception as e:
+            self.logger.debug("Closing websocket %s failed: %r", conn["id"], e)
     
-    async def send_to_client(self, connection_id: str, message: Dict[str, Any]):
+    async def send_to_client(self, connection_id: str, message: Dict[str, Any]) -> bool:
         """
         Enviar mensaje a un cliente específico.
         
+        Pasa por las colas de la conexión, como los broadcasts: un único
+        escritor por websocket y el orden se conserva dentro de cada carril.
+        
         Args:
             connection_id: ID de la conexión
             message: Mensaje a enviar
+            
+        Returns:
+            True si el mensaje quedó encolado
         """
-        for conn in self.active_connections:
-            if conn["id"] == connection_id:
-                try:
-                    await conn["websocket"].send_json(message)
-                    return True
-                except Exception as e:
-                    self.logger.warning(f"❌ Failed to send to {connection_id}: {e}")
-                    return False
-        
-        self.logger.warning(f"⚠️ Connection {connection_id} not found")
-        return False
+        conn = self.active_connections.get(connection_id)
+        if conn is None:
+            self.logger.warning(f"⚠️ Connection {connection_id} not found")
+            return False
+        
+        lane = "high" if message.get("type") in _HIGH_PRIORITY_TYPES else "low"
+        data = _pack(message) if conn["binary"] else orjson.dumps(message).decode()
+        self._enqueue(conn, data, lane)
+        return True
+    
+    def send_state_to_client(self, connection_id: str, message_type: str, state: Dict[str, Any]) -> bool:
+        """
+        Enviar el estado unificado a un cliente (initial_state, current_state).
+        
+        Reutiliza el frame serializado si el estado no ha cambiado desde el
+        último envío del mismo tipo y formato.
+        
+        Returns:
+            True si el mensaje quedó encolado
+        """
+        conn = self.active_connections.get(connection_id)
+        if conn is None:
+            self.logger.warning(f"⚠️ Connection {connection_id} not found")
+            return False
+        
+        key = (message_type, conn["binary"])
+        cached = self._state_frames.get(key)
+        if cached is None or cached[0] is not state:
+            message = {"type": message_type, "payload": state}
+            data = _pack(message) if conn["binary"] else orjson.dumps(message).decode()
+            cached = self._state_frames[key] = (state, data)
+        
+        self._enqueue(conn, cached[1], "high")
+        return True
+    
+    async def receive_message(self, websocket: WebSocket) -> Dict[str, Any]:
+        """
+        Recibir un mensaje del cliente, en JSON (texto) o MessagePack (binario).
+        
+        Raises:
+            WebSocketDisconnect: si el cliente cierra la conexión
+        """
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        
+        data = message.get("bytes")
+        if data is not None:
+            return msgpack.unpackb(data)
+        return orjson.loads(message["text"])
     
     # ===============================================
     # MÉTODOS ESPECÍFICOS PARA DIFERENTES EVENTOS
@@ -127,10 +361,12 @@ class WebSocketManager:
     
     async def broadcast_unified_state(self, state: Dict[str, Any]):
         """Enviar estado unificado del sistema"""
-        await self.broadcast({
-            "type": "unified_state_update",
-            "payload": state
-        })
+        envelope = self._unified_envelope
+        envelope["payload"] = state
+        envelope["timestamp"] = _now_ms()
+        await self.broadcast(envelope)
+        # No retener el estado hasta el siguiente envío
+        envelope["payload"] = None
     
     async def broadcast_hardware_event(self, event: Dict[str, Any]):
         """Enviar evento del hardware"""
@@ -155,13 +391,15 @@ class WebSocketManager:
     
     async def broadcast_error(self, error: str, details: Dict[str, Any] = None):
         """Enviar notificación de error"""
+        timestamp = _now_ms()
         await self.broadcast({
             "type": "error",
             "payload": {
                 "message": error,
                 "details": details or {},
-                "timestamp": int(time.time() * 1000)
-            }
+                "timestamp": timestamp
+            },
+            "timestamp": timestamp
         })
     
     async def broadcast_metrics(self, metrics: Dict[str, Any]):
@@ -171,34 +409,6 @@ class WebSocketManager:
             "payload": metrics
         })
     
-    # ===============================================
-    # MÉTODOS DE COMPATIBILIDAD (CÓDIGO ANTERIOR)
-    # ===============================================
-    
-    async def broadcast_status(self, status: str):
-        """Compatibilidad: enviar estado del asistente"""
-        await self.broadcast({
-            "type": "status_update",
-            "payload": {"status": status}
-        })
-    
-    async def broadcast_hardware_status(self, status: Dict[str, Any]):
-        """Compatibilidad: enviar estado del hardware"""
-        await self.broadcast({
-            "type": "hardware_status_update",
-            "payload": status
-        })
-    
-    async def broadcast_command(self, command: str):
-        """Compatibilidad: enviar comando/transcripción"""
-        await self.broadcast({
-            "type": "command_log",
-            "payload": {
-                "command": command,
-                "timestamp": int(time.time() * 1000)
-            }
-        })
-    
     # ===============================================
     # INFORMACIÓN Y ESTADÍSTICAS
     # ===============================================
@@ -214,9 +424,10 @@ class WebSocketManager:
                 "id": conn["id"],
                 "client_ip": conn["client_ip"],
                 "connected_at": conn["connected_at"],
-                "duration_seconds": time.time() - conn["connected_at"]
+                "duration_seconds": time.time() - conn["connected_at"],
+                "dropped_messages": conn["dropped"]
             }
-            for conn in self.active_connections
+            for conn in self.active_connections.values()
         ]
     
     def is_connected(self) -> bool:
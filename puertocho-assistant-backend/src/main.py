@@ -17,10 +17,13 @@ import os
 import logging
 import signal
 import sys
+import orjson
 from datetime import datetime
+from typing import Set
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
 # Imports locales
@@ -30,12 +33,23 @@ from core.state_manager import init_state_manager, close_state_manager, get_stat
 from clients.hardware_client import init_hardware_client, close_hardware_client, get_hardware_client
 from clients.remote_backend_client import init_remote_client, close_remote_client
 from services.audio_processor import init_audio_processor, close_audio_processor, get_audio_processor
-from api.gateway_endpoints import router as gateway_router
+from api.gateway_endpoints import router as gateway_router, bind_services
 
 
 # Configurar logging
 backend_logger = setup_logging()
 
+# Manejadores de mensajes WebSocket en curso (referencia fuerte hasta que
+# terminen); se lanzan aparte para no bloquear el bucle de recepción
+_WS_HANDLER_TASKS: Set[asyncio.Task] = set()
+
+
+def _spawn_ws_handler(coro):
+    """Ejecutar un manejador de mensaje WebSocket fuera del bucle de recepción"""
+    task = asyncio.create_task(coro)
+    _WS_HANDLER_TASKS.add(task)
+    task.add_done_callback(_WS_HANDLER_TASKS.discard)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -44,6 +58,9 @@ async def lifespan(app: FastAPI):
     Inicializa y limpia recursos al iniciar/cerrar.
     """
     backend_logger.info("🚀 Starting PuertoCho Backend Gateway...")
+    # Confirmar qué event loop ha instalado uvicorn (uvloop en start())
+    loop_type = type(asyncio.get_running_loop())
+    backend_logger.info(f"🔁 Event loop: {loop_type.__module__}.{loop_type.__qualname__}")
     
     try:
         # 1. Inicializar cliente hardware
@@ -78,6 +95,9 @@ async def lifespan(app: FastAPI):
         await audio_processor.start()
         backend_logger.info("🎙️ Audio processor configured for remote backend processing")
         
+        # 5. Enlazar singletons en el router de la API
+        bind_services()
+        
         backend_logger.info("✅ Backend Gateway startup complete!")
         
         yield  # Aplicación ejecutándose
@@ -94,6 +114,7 @@ async def lifespan(app: FastAPI):
             await close_audio_processor()
             await close_remote_client()
             await close_state_manager()
+            await websocket_manager.stop()
             await close_hardware_client()
             backend_logger.info("✅ Backend Gateway shutdown complete")
         except Exception as e:
@@ -105,7 +126,8 @@ app = FastAPI(
     title="PuertoCho Backend Gateway",
     description="Gateway entre hardware, frontend y backend remoto",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configurar CORS
@@ -167,7 +189,7 @@ async def health_check():
         
         health_info = {
             "status": overall_status,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),  # orjson serializa datetime en ISO 8601
             "components": {
                 "hardware": {
                     "available": hardware_available,
@@ -210,13 +232,10 @@ async def websocket_endpoint(websocket: WebSocket):
             state_manager = get_state_manager()
             unified_state = state_manager.get_unified_state()
             
-            await websocket.send_json({
-                "type": "initial_state",
-                "payload": unified_state
-            })
+            websocket_manager.send_state_to_client(connection_id, "initial_state", unified_state)
             
             # Enviar información de conexión
-            await websocket.send_json({
+            await websocket_manager.send_to_client(connection_id, {
                 "type": "connection_info",
                 "payload": {
                     "connection_id": connection_id,
@@ -231,22 +250,24 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             try:
                 # Recibir mensajes del cliente
-                data = await websocket.receive_json()
+                data = await websocket_manager.receive_message(websocket)
                 message_type = data.get("type", "unknown")
                 
-                backend_logger.info(f"📡 WebSocket message from {connection_id}: {message_type}")
+                # Uno por mensaje (pings incluidos): debug con formato diferido
+                backend_logger.debug("📡 WebSocket message from %s: %s", connection_id, message_type)
                 
-                # Procesar diferentes tipos de mensajes
+                # Procesar diferentes tipos de mensajes; los que esperan al
+                # hardware corren en su propia tarea para seguir recibiendo
                 if message_type == "manual_activation":
-                    await handle_manual_activation(data)
+                    _spawn_ws_handler(handle_manual_activation(data))
                 elif message_type == "hardware_command":
-                    await handle_hardware_command(data)
+                    _spawn_ws_handler(handle_hardware_command(data))
                 elif message_type == "get_state":
                     await handle_get_state_request(websocket, connection_id)
                 elif message_type == "audio_captured":
-                    await handle_audio_captured(data)
+                    _spawn_ws_handler(handle_audio_captured(data))
                 elif message_type == "ping":
-                    await websocket.send_json({"type": "pong", "timestamp": data.get("timestamp")})
+                    await websocket_manager.send_to_client(connection_id, {"type": "pong", "timestamp": data.get("timestamp")})
                 else:
                     backend_logger.warning(f"⚠️ Unknown WebSocket message type: {message_type}")
                     
@@ -279,7 +300,7 @@ async def hardware_websocket_endpoint_disabled(websocket: WebSocket):
         while True:
             try:
                 # Recibir mensaje del hardware
-                data = await websocket.receive_json()
+                data = orjson.loads(await websocket.receive_text())
                 message_type = data.get("type", "unknown")
                 message_data = data.get("data", {})
                 
@@ -419,10 +440,7 @@ async def handle_get_state_request(websocket: WebSocket, connection_id: str):
         state_manager = get_state_manager()
         unified_state = state_manager.get_unified_state()
         
-        await websocket.send_json({
-            "type": "current_state",
-            "payload": unified_state
-        })
+        websocket_manager.send_state_to_client(connection_id, "current_state", unified_state)
         
     except Exception as e:
         backend_logger.error(f"❌ Failed to send state to {connection_id}: {e}")
@@ -479,6 +497,15 @@ def start():
             host="0.0.0.0",
             port=8000,
             reload=False,  # Disabled para producción
+            # Event loop y parser HTTP en C (incluidos en uvicorn[standard]).
+            # Un solo worker: WebSockets y singletons viven en este proceso
+            loop="uvloop",
+            http="httptools",
+            # Frames de estado pequeños: comprimir cada uno por cliente cuesta
+            # más CPU del Pi de lo que ahorra en la red local
+            ws="websockets",
+            ws_per_message_deflate=False,
+            server_header=False,
             log_level="info",
             access_log=False  # Usamos nuestro middleware de logging
         )
@@ -7,7 +7,7 @@ en el hardware para mantener consistencia.
 """
 
 import time
-import uuid
+import secrets
 import logging
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -28,15 +28,15 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         """Procesar petición HTTP con logging"""
         
-        # Generar ID único para la petición
-        request_id = str(uuid.uuid4())[:8]
+        # Generar ID único para la petición (8 caracteres hex, sin uuid4)
+        request_id = secrets.token_hex(4)
         
         # Información del cliente
         client_ip = request.client.host if request.client else "unknown"
         user_agent = request.headers.get("user-agent", "unknown")
         
-        # Registrar inicio de petición
-        start_time = time.time()
+        # Registrar inicio de petición (reloj monotónico: solo mide duración)
+        start_time = time.perf_counter()
         
         self.logger.info(
             f"🌐 HTTP Request [{request_id}]: {request.method} {request.url.path}",
@@ -59,7 +59,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
             
             # Calcular tiempo de procesamiento
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             
             # Registrar respuesta exitosa
             self.logger.info(
@@ -81,7 +81,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             
         except Exception as e:
             # Calcular tiempo hasta el error
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             
             # Registrar error
             self.logger.error(
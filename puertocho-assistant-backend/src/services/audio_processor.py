@@ -8,15 +8,20 @@ Maneja buffer, cola de peticiones y procesamiento cuando el remoto está disponi
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from pathlib import Path
 import tempfile
 import os
-import json
-import base64
+import shutil
+import socket
+import orjson
 
-from clients.hardware_client import get_hardware_client
+from clients.hardware_client import get_hardware_client, HardwareClient
+from clients.remote_backend_client import get_remote_client
+
+# Bytes de cabecera suficientes para validar la integridad del audio
+AUDIO_HEADER_SIZE = 44
 
 
 class AudioProcessor:
@@ -35,6 +40,9 @@ class AudioProcessor:
         self.logger = logging.getLogger("audio_processor")
         self.websocket_manager = websocket_manager
         
+        # Cliente hardware, resuelto una sola vez en start()
+        self.hardware_client: Optional[HardwareClient] = None
+        
         # Buffer y cola de audio
         self.audio_queue: asyncio.Queue = asyncio.Queue()
         self.processing_queue: List[Dict[str, Any]] = []
@@ -77,6 +85,7 @@ class AudioProcessor:
         self.logger.info("🎙️ Starting Audio Processor...")
         
         self._running = True
+        self.hardware_client = get_hardware_client()
         self._processing_task = asyncio.create_task(self._processing_loop())
         
         # Limpieza inicial de archivos de verificación antiguos
@@ -155,7 +164,7 @@ class AudioProcessor:
             
             # Obtener información del último audio capturado
             self.logger.info("🔗 Connecting to hardware client...")
-            hardware_client = get_hardware_client()
+            hardware_client = self.hardware_client
             
             hardware_fetch_start = datetime.now()
             latest_audio = await hardware_client.get_latest_audio()
@@ -173,33 +182,40 @@ class AudioProcessor:
             
             self.logger.info(f"📄 Hardware audio file info: {audio_file_info}")
             
-            # Descargar archivo de audio
+            audio_id = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+            
+            # Descargar archivo de audio directamente al buffer temporal
+            # (streaming por bloques: no se materializa el audio en memoria)
             download_start = datetime.now()
             self.logger.info(f"📥 Downloading audio file: {filename}")
-            audio_data = await hardware_client.download_audio(filename)
+            self.temp_dir.mkdir(exist_ok=True)
+            temp_file_path = self.temp_dir / f"{audio_id}.wav"
+            audio_size = await hardware_client.stream_audio(filename, temp_file_path)
             download_duration = (datetime.now() - download_start).total_seconds()
             
             # Validar descarga
-            if not audio_data:
+            if not audio_size:
+                temp_file_path.unlink(missing_ok=True)
                 raise Exception(f"Downloaded audio data is empty for file: {filename}")
             
-            download_size_kb = len(audio_data) / 1024
+            download_size_kb = audio_size / 1024
             download_speed_kbps = download_size_kb / download_duration if download_duration > 0 else 0
             
-            self.logger.info(f"📦 Download completed: {len(audio_data)} bytes ({download_size_kb:.2f} KB) "
+            self.logger.info(f"📦 Download completed: {audio_size} bytes ({download_size_kb:.2f} KB) "
                            f"in {download_duration:.3f} seconds ({download_speed_kbps:.2f} KB/s)")
             
-            # Validar integridad básica del audio
-            integrity_check = self._validate_audio_integrity(audio_data, filename)
+            # Validar integridad básica del audio (solo necesita el header)
+            with open(temp_file_path, "rb") as f:
+                audio_header = f.read(AUDIO_HEADER_SIZE)
+            integrity_check = self._validate_audio_integrity(audio_header, filename)
             self.logger.info(f"🔍 Audio integrity check: {integrity_check}")
             
             # Crear entrada para procesamiento con información extendida
-            audio_id = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
             processing_entry = {
                 "id": audio_id,
                 "filename": filename,
                 "original_filename": audio_info.get("filename", filename),
-                "size_bytes": len(audio_data),
+                "size_bytes": audio_size,
                 "received_at": audio_info.get("received_at", datetime.now().isoformat()),
                 "processing_started_at": processing_start.isoformat(),
                 "status": "pending",
@@ -215,15 +231,12 @@ class AudioProcessor:
             
             self.logger.info(f"🆔 Created processing entry with ID: {audio_id}")
             
-            # Guardar audio en buffer temporal
-            temp_save_start = datetime.now()
-            temp_file_path = await self._save_to_temp_buffer(processing_entry["id"], audio_data)
-            temp_save_duration = (datetime.now() - temp_save_start).total_seconds()
-            
+            # El audio ya se escribió en el buffer temporal durante la descarga
+            temp_save_duration = 0.0
             processing_entry["temp_path"] = str(temp_file_path)
             processing_entry["timing"]["temp_save_seconds"] = temp_save_duration
             
-            self.logger.info(f"💾 Temporary file saved in {temp_save_duration:.3f} seconds: {temp_file_path}")
+            self.logger.info(f"💾 Temporary file saved: {temp_file_path}")
             
             # Guardar copia de verificación si está habilitado
             verification_path = None
@@ -232,7 +245,7 @@ class AudioProcessor:
                 verification_path = await self._save_verification_copy(
                     processing_entry["id"], 
                     filename, 
-                    audio_data
+                    temp_file_path
                 )
                 verification_duration = (datetime.now() - verification_start).total_seconds()
                 
@@ -260,7 +273,7 @@ class AudioProcessor:
                     "action": "audio_received",
                     "audio_id": processing_entry["id"],
                     "filename": filename,
-                    "size_bytes": len(audio_data),
+                    "size_bytes": audio_size,
                     "queue_size": current_queue_size,
                     "processing_time_seconds": total_processing_time
                 })
@@ -313,7 +326,7 @@ class AudioProcessor:
         Valida la integridad básica del archivo de audio.
         
         Args:
-            audio_data: Datos del audio
+            audio_data: Datos del audio (basta con los primeros AUDIO_HEADER_SIZE bytes)
             filename: Nombre del archivo
             
         Returns:
@@ -360,41 +373,6 @@ class AudioProcessor:
         
         return validation
     
-    async def _save_to_temp_buffer(self, audio_id: str, audio_data: bytes) -> Path:
-        """Guardar audio en buffer temporal con logging detallado"""
-        temp_file_path = self.temp_dir / f"{audio_id}.wav"
-        
-        try:
-            # Verificar que el directorio temporal existe
-            self.temp_dir.mkdir(exist_ok=True)
-            
-            # Escribir archivo con medición de tiempo
-            write_start = datetime.now()
-            with open(temp_file_path, "wb") as f:
-                f.write(audio_data)
-            write_duration = (datetime.now() - write_start).total_seconds()
-            
-            # Verificar que el archivo se escribió correctamente
-            if not temp_file_path.exists():
-                raise Exception(f"Temp file was not created: {temp_file_path}")
-            
-            written_size = temp_file_path.stat().st_size
-            if written_size != len(audio_data):
-                raise Exception(f"Size mismatch: expected {len(audio_data)}, written {written_size}")
-            
-            write_speed_kbps = (len(audio_data) / 1024) / write_duration if write_duration > 0 else 0
-            
-            self.logger.debug(f"💾 Audio saved to temp buffer: {temp_file_path}")
-            self.logger.debug(f"📏 Write performance: {len(audio_data)} bytes in {write_duration:.3f}s ({write_speed_kbps:.2f} KB/s)")
-            
-            return temp_file_path
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to save audio to temp buffer: {e}")
-            self.logger.error(f"📁 Temp directory: {self.temp_dir}")
-            self.logger.error(f"📄 Target file: {temp_file_path}")
-            raise
-    
     async def _add_to_processing_queue(self, entry: Dict[str, Any]):
         """Agregar entrada a la cola de procesamiento con logging mejorado"""
         entry_id = entry.get('id', 'unknown')
@@ -533,9 +511,6 @@ class AudioProcessor:
         Enviar audio al backend remoto para procesamiento conversacional.
         """
         try:
-            # Importar el cliente remoto
-            from clients.remote_backend_client import get_remote_client
-            
             entry_id = entry.get('id', 'unknown')
             self.logger.info(f"📡 Sending audio {entry_id} to remote backend...")
             
@@ -544,11 +519,15 @@ class AudioProcessor:
             
             # Leer datos de audio
             audio_file_path = entry.get('temp_path')
-            if not audio_file_path or not os.path.exists(audio_file_path):
+            if not audio_file_path:
                 raise ValueError(f"Audio file not found: {audio_file_path}")
             
-            with open(audio_file_path, 'rb') as f:
-                audio_data = f.read()
+            # El cliente remoto necesita los bytes completos (digest, multipart
+            # y reintentos); la lectura va a un hilo para no bloquear el loop
+            try:
+                audio_data = await asyncio.to_thread(Path(audio_file_path).read_bytes)
+            except FileNotFoundError:
+                raise ValueError(f"Audio file not found: {audio_file_path}")
             
             # Preparar parámetros conversacionales
             session_id = self._resolve_session_id()
@@ -558,14 +537,24 @@ class AudioProcessor:
             
             self.logger.info(f"�️ Conversation params - Session: {session_id}, User: {user_id}, Lang: {language}")
             
+            # Texto parcial del canal de streaming del remoto → frontend
+            async def on_partial(event: Dict[str, Any]):
+                if self.websocket_manager:
+                    await self.websocket_manager.broadcast_audio_processing({
+                        "action": "partial_response",
+                        "audio_id": entry_id,
+                        "text": event.get("text", "")
+                    })
+            
             # Enviar al backend remoto
             response = await remote_client.send_audio_for_conversation(
                 audio_data=audio_data,
                 session_id=session_id,
                 user_id=user_id,
                 language=language,
-                metadata_json=json.dumps(metadata),
-                generate_audio_response=True
+                metadata_json=orjson.dumps(metadata).decode(),
+                generate_audio_response=True,
+                on_partial=on_partial
             )
             
             if response.get("success"):
@@ -575,15 +564,16 @@ class AudioProcessor:
                 if response.get("text"):
                     self.logger.info(f"📝 Transcription: {response['text'][:100]}...")
                 
-                # Procesar respuesta de audio si existe
-                audio_response_data = None
-                if response.get("audioResponse"):
+                # Procesar respuesta de audio si existe. El remoto la envía en
+                # Base64 y el hardware la espera en Base64: se reenvía tal cual,
+                # sin decodificar y volver a codificar aquí
+                audio_response_b64 = response.get("audioResponse")
+                if audio_response_b64:
                     try:
-                        audio_response_data = base64.b64decode(response["audioResponse"])
-                        self.logger.info(f"🔊 Audio response received: {len(audio_response_data)} bytes")
+                        self.logger.info(f"🔊 Audio response received: ~{len(audio_response_b64) * 3 // 4} bytes")
                         
                         # Enviar audio al hardware para reproducción
-                        await self._send_audio_to_hardware(audio_response_data)
+                        await self._send_audio_to_hardware(audio_response_b64)
                         
                     except Exception as e:
                         self.logger.error(f"❌ Error processing audio response: {e}")
@@ -595,7 +585,7 @@ class AudioProcessor:
                         "transcription": response.get("text", ""),
                         "intent": response.get("intent", "unknown"),
                         "confidence": response.get("confidence", 0.0),
-                        "has_audio_response": bool(audio_response_data),
+                        "has_audio_response": bool(audio_response_b64),
                         "response_duration": response.get("audioDuration", 0.0)
                     })
                 
@@ -604,7 +594,7 @@ class AudioProcessor:
                     "transcription": response.get("text", ""),
                     "intent": response.get("intent", "unknown"),
                     "confidence": response.get("confidence", 0.0),
-                    "has_audio_response": bool(audio_response_data),
+                    "has_audio_response": bool(audio_response_b64),
                     "processing_time_ms": response.get("processingTime", 0)
                 }
             else:
@@ -632,20 +622,19 @@ class AudioProcessor:
     
     def _get_hostname(self) -> str:
         try:
-            import socket
             return socket.gethostname()
         except Exception:
             return "unknown"
     
-    async def _send_audio_to_hardware(self, audio_data: bytes):
+    async def _send_audio_to_hardware(self, audio_b64: str):
         """
         Enviar audio al hardware para reproducción.
+        
+        Args:
+            audio_b64: Audio en Base64, tal como lo devuelve el backend remoto
         """
         try:
-            hardware_client = get_hardware_client()
-            
-            # Codificar audio en base64 para envío
-            audio_b64 = base64.b64encode(audio_data).decode()
+            hardware_client = self.hardware_client
             
             # Enviar al hardware
             response = await hardware_client.play_audio({
@@ -681,7 +670,6 @@ class AudioProcessor:
                 
                 # Verificar si el cliente remoto está disponible
                 try:
-                    from clients.remote_backend_client import get_remote_client
                     remote_client = get_remote_client()
                     
                     # Verificar autenticación
@@ -755,14 +743,14 @@ class AudioProcessor:
     # VERIFICACIÓN DE AUDIO
     # ===============================================
     
-    async def _save_verification_copy(self, audio_id: str, original_filename: str, audio_data: bytes) -> Path:
+    async def _save_verification_copy(self, audio_id: str, original_filename: str, source_path: Path) -> Path:
         """
         Guardar copia de verificación del audio.
         
         Args:
             audio_id: ID del audio para procesamiento
             original_filename: Nombre del archivo original del hardware
-            audio_data: Datos binarios del audio
+            source_path: Archivo de audio ya descargado en el buffer temporal
             
         Returns:
             Path al archivo de verificación guardado
@@ -777,11 +765,10 @@ class AudioProcessor:
             verification_filename = f"verification_{timestamp}_{microsec}_{original_filename}"
             verification_path = self.verification_dir / verification_filename
             
-            # Guardar archivo
-            with open(verification_path, "wb") as f:
-                f.write(audio_data)
+            # Copiar archivo (copia a nivel de sistema, sin pasar por memoria)
+            shutil.copyfile(source_path, verification_path)
             
-            self.logger.debug(f"🔍 Verification copy saved: {verification_path} ({len(audio_data)} bytes)")
+            self.logger.debug(f"🔍 Verification copy saved: {verification_path}")
             
             return verification_path
             
@@ -878,17 +865,12 @@ class AudioProcessor:
             }
         
         try:
-            if not self.verification_dir.exists():
-                self.verification_dir.mkdir(exist_ok=True)
-            
-            verification_files = list(self.verification_dir.glob("verification_*.wav"))
-            verification_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+            verification_files = await asyncio.to_thread(self._scan_verification_files, True)
             
             files_info = []
             total_size = 0
             
-            for file_path in verification_files:
-                stat = file_path.stat()
+            for file_path, stat in verification_files:
                 file_info = {
                     "filename": file_path.name,
                     "size_bytes": stat.st_size,
@@ -929,14 +911,11 @@ class AudioProcessor:
             return []
         
         try:
-            verification_files = list(self.verification_dir.glob("verification_*.wav"))
-            verification_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+            verification_files = await asyncio.to_thread(self._scan_verification_files)
             
             files_list = []
             
-            for file_path in verification_files[:limit]:
-                stat = file_path.stat()
-                
+            for file_path, stat in verification_files[:limit]:
                 # Intentar extraer información del nombre del archivo
                 filename_parts = file_path.stem.split('_')
                 original_info = {}
@@ -971,6 +950,25 @@ class AudioProcessor:
             self.logger.error(f"❌ Error listing verification files: {e}")
             return []
     
+    def _scan_verification_files(self, create_dir: bool = False) -> List[Tuple[Path, os.stat_result]]:
+        """
+        Listar los archivos de verificación con su stat, más recientes primero.
+        
+        Hace I/O de disco bloqueante: llamar mediante asyncio.to_thread.
+        Cada archivo se consulta con stat una sola vez (ordenación incluida).
+        """
+        if create_dir:
+            self.verification_dir.mkdir(exist_ok=True)
+        
+        verification_files = []
+        with os.scandir(self.verification_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("verification_") and entry.name.endswith(".wav"):
+                    verification_files.append((Path(entry.path), entry.stat()))
+        
+        verification_files.sort(key=lambda item: item[1].st_mtime, reverse=True)
+        return verification_files
+    
     def get_processing_statistics(self) -> Dict[str, Any]:
         """
         Obtener estadísticas detalladas de procesamiento.
@@ -1066,7 +1064,6 @@ class AudioProcessor:
     def _get_free_space(self, directory: Path) -> int:
         """Obtener espacio libre en el directorio"""
         try:
-            import shutil
             total, used, free = shutil.disk_usage(directory)
             return free
         except Exception:
@@ -0,0 +1,9 @@
+# Utils package for PuertoCho Backend
+
+from .cache import AsyncTTLCache
+from .clock import now_iso
+
+__all__ = [
+    "AsyncTTLCache",
+    "now_iso"
+]
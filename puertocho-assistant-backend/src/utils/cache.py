@@ -0,0 +1,68 @@
+"""
+Async TTL Cache for PuertoCho Assistant Backend
+==============================================
+
+Caché en memoria con TTL y single-flight para endpoints consultados
+periódicamente (polling del frontend). Mientras un valor está vigente se
+sirve desde RAM; si caduca, solo una corrutina lo recalcula y el resto
+de llamadas concurrentes esperan ese mismo resultado.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class AsyncTTLCache:
+    """
+    Caché asíncrona por clave con expiración y coalescencia de peticiones.
+    
+    Los errores del productor se propagan a todos los que esperaban y no
+    se almacenan: la siguiente llamada vuelve a intentarlo.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._store: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+    
+    async def get_or_set(
+        self,
+        key: Hashable,
+        producer: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Obtener el valor de la clave, calculándolo con producer si caducó.
+        
+        Args:
+            key: Clave de caché
+            producer: Corrutina sin argumentos que produce el valor
+            ttl: TTL específico para esta clave (por defecto self.ttl)
+        """
+        entry = self._store.get(key)
+        if entry is not None and time.monotonic() - entry[0] < (self.ttl if ttl is None else ttl):
+            return entry[1]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            # La tarea es independiente del llamador: si éste se cancela,
+            # el resto de corrutinas en espera siguen recibiendo el resultado
+            task = asyncio.ensure_future(producer())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        
+        return await asyncio.shield(task)
+    
+    def _on_done(self, key: Hashable, task: asyncio.Future):
+        """Guardar el resultado al completar la tarea en vuelo"""
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store[key] = (time.monotonic(), task.result())
+    
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Invalidar una clave o toda la caché"""
+        if key is None:
+            self._store.clear()
+        else:
+            self._store.pop(key, None)
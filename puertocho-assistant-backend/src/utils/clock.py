@@ -0,0 +1,32 @@
+"""
+Cached Clock for PuertoCho Assistant Backend
+===========================================
+
+Timestamp ISO 8601 con resolución de 100 ms para respuestas de la API.
+Evita construir un datetime y formatearlo en cada petición cuando varias
+respuestas caen en la misma ventana.
+"""
+
+import time
+from datetime import datetime
+
+# Resolución del reloj cacheado (segundos)
+CLOCK_RESOLUTION = 0.1
+
+_cached_at = 0.0
+_cached_iso = ""
+
+
+def now_iso() -> str:
+    """
+    Obtener la hora local actual en ISO 8601 (resolución CLOCK_RESOLUTION).
+    
+    No usar para medir duraciones ni para ordenar eventos: para eso
+    se necesita la hora exacta.
+    """
+    global _cached_at, _cached_iso
+    now = time.time()
+    if now - _cached_at >= CLOCK_RESOLUTION:
+        _cached_at = now
+        _cached_iso = datetime.fromtimestamp(now).isoformat()
+    return _cached_iso